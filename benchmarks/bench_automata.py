@@ -0,0 +1,145 @@
+'''
+Benchmarks for the lab1 grammar / automaton and the lab2 finite automaton.
+
+Every input is produced by a seeded generator, so two runs with the same
+arguments time exactly the same work. Results are printed (or written with
+--output) as JSON: one record per (benchmark, size) with the best wall time
+over the repeats and the peak memory traced during one extra run.
+
+    python benchmarks/bench_automata.py --sizes 8 16 32 --repeat 3
+'''
+
+
+import argparse
+import os
+import random
+import sys
+
+from bench_common import measure, write_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lab1"))
+sys.path.insert(0, os.path.join(ROOT, "lab2"))
+
+from main import Grammar  # noqa: E402  (lab1)
+from main2 import FiniteAutomaton  # noqa: E402  (lab2)
+
+
+def _symbols(count, offset=0):
+    """count distinct single-character symbols, as lab1 grammars need."""
+    return [chr(0x100 + offset + i) for i in range(count)]
+
+
+def random_nfa(states, alphabet_size, density, nondeterminism, seed):
+    """Random lab2 NFA.
+
+    Each (state, symbol) pair gets a transition with probability density;
+    a transition has one target plus, with probability nondeterminism each
+    time, one more random target. Roughly a quarter of the states are final.
+    """
+    rng = random.Random(seed)
+    names = [f"q{i}" for i in range(states)]
+    alphabet = [chr(ord('a') + i) for i in range(alphabet_size)]
+    transitions = {}
+    for state in names:
+        for symbol in alphabet:
+            if rng.random() < density:
+                targets = {rng.choice(names)}
+                while rng.random() < nondeterminism and len(targets) < states:
+                    targets.add(rng.choice(names))
+                transitions[(state, symbol)] = sorted(targets)
+    final_states = {state for state in names if rng.random() < 0.25} or {names[-1]}
+    return FiniteAutomaton(set(names), set(alphabet), transitions, names[0], final_states)
+
+
+def nth_from_end_nfa(n):
+    """NFA for "the n-th symbol from the end is a" over {a, b}.
+
+    It has n + 1 states, its minimal DFA has 2^n.
+    """
+    names = [f"q{i}" for i in range(n + 1)]
+    transitions = {('q0', 'a'): ['q0', 'q1'], ('q0', 'b'): ['q0']}
+    for i in range(1, n):
+        transitions[(names[i], 'a')] = [names[i + 1]]
+        transitions[(names[i], 'b')] = [names[i + 1]]
+    return FiniteAutomaton(set(names), {'a', 'b'}, transitions, 'q0', {names[n]})
+
+
+def random_right_linear_grammar(non_terminals, terminals, rules_per_symbol, seed):
+    """Random lab1 Grammar with rules A -> aB and A -> a.
+
+    Every non-terminal gets at least one terminating rule, so generation
+    always ends.
+    """
+    rng = random.Random(seed)
+    variables = _symbols(non_terminals)
+    alphabet = _symbols(terminals, offset=non_terminals)
+    productions = {}
+    for variable in variables:
+        options = [rng.choice(alphabet)]
+        for _ in range(rules_per_symbol - 1):
+            options.append(rng.choice(alphabet) + rng.choice(variables))
+        productions[variable] = options
+    return Grammar(set(variables), set(alphabet), productions, variables[0])
+
+
+def benchmarks(size, args):
+    """Yield (name, parameters, function) for one problem size."""
+    seed = args.seed
+    nfa = random_nfa(size, args.alphabet, args.density, args.nondeterminism, seed)
+    parameters = {"states": size, "alphabet": args.alphabet, "density": args.density,
+                  "nondeterminism": args.nondeterminism}
+    yield "convert_ndfa_to_dfa/random", parameters, nfa.convert_ndfa_to_dfa
+    yield "to_regular_grammar/random", parameters, nfa.to_regular_grammar
+
+    # 2^n DFA states, keep n small enough to finish
+    n = min(size // 2, 14)
+    worst = nth_from_end_nfa(n)
+    yield "convert_ndfa_to_dfa/nth_from_end", {"n": n}, worst.convert_ndfa_to_dfa
+
+    grammar = random_right_linear_grammar(size, 4, 3, seed)
+    strings = list(grammar.generate_strings(1000, seed=seed))
+    automaton = grammar.to_finite_automaton()
+    automaton.compile()
+
+    def check_all():
+        for s in strings:
+            automaton.string_belongs_to_language(s)
+
+    def generate():
+        for _ in range(1000):
+            grammar.generate_string()
+
+    parameters = {"non_terminals": size, "strings": len(strings), "symbols": sum(map(len, strings))}
+    yield "string_belongs_to_language", parameters, check_all
+    yield "generate_string", {"non_terminals": size, "strings": 1000}, generate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark lab1/lab2 automata")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 16, 32, 64], help="problem sizes (states)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed of every generator")
+    parser.add_argument("--alphabet", type=int, default=2, help="random NFA alphabet size")
+    parser.add_argument("--density", type=float, default=0.6,
+                        help="probability that a random NFA state has a move on a symbol")
+    parser.add_argument("--nondeterminism", type=float, default=0.1,
+                        help="probability of each extra target of a random NFA move")
+    parser.add_argument("--output", metavar="FILE", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    results = []
+    for size in args.sizes:
+        for name, parameters, function in benchmarks(size, args):
+            record = {"benchmark": name, "size": size, "parameters": parameters}
+            record.update(measure(function, args.repeat))
+            results.append(record)
+            print(f"{name:40} size={size:<6} {record['seconds'] * 1000:10.2f} ms "
+                  f"{record['peak_bytes'] / 1024:10.1f} KiB", file=sys.stderr)
+
+    write_report(args, results)
+
+
+if __name__ == "__main__":
+    main()
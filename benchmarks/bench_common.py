@@ -0,0 +1,45 @@
+'''
+Helpers shared by the benchmark scripts: timing one benchmark and writing
+the JSON report.
+'''
+
+
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+
+def measure(function, repeat):
+    """Best wall time over repeat runs, then peak traced memory of one more run."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def write_report(args, results):
+    """Write the results with the run settings as JSON to args.output or stdout."""
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as out:
+            json.dump(report, out, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,149 @@
+'''
+Throughput benchmarks for the lab3 Tokenizer.
+
+Scripts are synthesized by a seeded generator with a configurable mix:
+nesting depth of IF blocks, length of string literals and the share of
+statements that are numeric (INT / DOUBLE / pixel values). Results are
+printed (or written with --output) as JSON: one record per (benchmark,
+size) with the best wall time, tokens/s, bytes/s and the peak memory traced
+during one extra run. With --profile every size also gets a per-TokenType
+count and the time spent in the Tokenizer scanning methods.
+
+    python benchmarks/bench_tokenizer.py --sizes 1000 10000 --if-depth 8 --profile
+'''
+
+
+import argparse
+import io
+import os
+import random
+import sys
+
+from bench_common import measure, write_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lab3", "code"))
+
+from Tokenizer import Tokenizer  # noqa: E402  (lab3)
+from TokenizerProfile import TokenizerProfile  # noqa: E402  (lab3)
+
+
+def synthesize_script(statements, if_depth, string_length, number_share, seed):
+    """DSL script of about `statements` statements.
+
+    A number_share of the statements declare INT, DOUBLE or pixel values,
+    the others are image operations, METADATA reads and string batches.
+    IF blocks are opened at random up to if_depth levels deep and all closed
+    at the end.
+    """
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz "
+    lines = ['BATCH #batch = "' + "".join(rng.choice(letters) for _ in range(string_length)) + '";',
+             'FOREACH IMG $img IN #batch {']
+    # One entry per open block: whether it is an IF block that may still get an ELSE
+    blocks = [False]
+    for i in range(statements):
+        indent = "    " * len(blocks)
+        if len(blocks) <= if_depth and rng.random() < 0.2:
+            lines.append(f"{indent}IF $v{i % 50} >= {rng.randrange(1000)} {{")
+            blocks.append(True)
+            continue
+        if len(blocks) > 1 and rng.random() < 0.1:
+            can_else = blocks.pop()
+            if can_else and rng.random() < 0.5:
+                lines.append("    " * len(blocks) + "} ELSE {")
+                blocks.append(False)
+            else:
+                lines.append("    " * len(blocks) + "}")
+            continue
+        if rng.random() < number_share:
+            kind = rng.randrange(3)
+            if kind == 0:
+                lines.append(f"{indent}INT $v{i % 50} = {rng.randrange(100000)} + {rng.randrange(100)} * 2;")
+            elif kind == 1:
+                lines.append(f"{indent}DOUBLE $d{i % 50} = {rng.random() * 1000:.4f} / 3.5;")
+            else:
+                lines.append(f"{indent}CROP $img ({rng.randrange(4000)}p, {rng.randrange(4000)}p);")
+        else:
+            kind = rng.randrange(4)
+            if kind == 0:
+                lines.append(f"{indent}INT $v{i % 50} = METADATA $img {rng.choice(['FWIDTH', 'FHEIGHT', 'FSIZE'])};")
+            elif kind == 1:
+                lines.append(f"{indent}SET $img {rng.choice(['NEGATIVE', 'SEPIA', 'BW', 'SHARPEN'])};")
+            elif kind == 2:
+                lines.append(f"{indent}ROTATE $img {rng.choice(['LEFT', 'RIGHT'])};")
+            else:
+                text = "".join(rng.choice(letters) for _ in range(string_length))
+                lines.append(f'{indent}BATCH #b{i % 50} = "{text}";')
+    while blocks:
+        blocks.pop()
+        lines.append("    " * len(blocks) + "}")
+    return "\n".join(lines) + "\n"
+
+
+def benchmarks(script):
+    """Yield (name, function) pairs; each function returns its token count."""
+    def tokenize():
+        return len(Tokenizer(script).tokenize())
+
+    def iter_tokens():
+        return sum(1 for _ in Tokenizer(script).iter_tokens())
+
+    def tokenize_buffer():
+        return len(Tokenizer(script).tokenize_buffer())
+
+    def tokenize_stream():
+        return sum(1 for _ in Tokenizer.tokenize_stream(io.StringIO(script)))
+
+    yield "tokenize", tokenize
+    yield "iter_tokens", iter_tokens
+    yield "tokenize_buffer", tokenize_buffer
+    yield "tokenize_stream", tokenize_stream
+
+
+def profile(script):
+    """Token counts per TokenType and method times of one profiled tokenize()."""
+    hook = TokenizerProfile()
+    hook.attach(Tokenizer(script)).tokenize()
+    return hook.report()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the lab3 tokenizer")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="script sizes (statements)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the script generator")
+    parser.add_argument("--if-depth", type=int, default=4, help="maximum IF nesting depth")
+    parser.add_argument("--string-length", type=int, default=24, help="length of string literals")
+    parser.add_argument("--number-share", type=float, default=0.4,
+                        help="share of statements with numeric values")
+    parser.add_argument("--profile", action="store_true", help="add per-TokenType counts and method times")
+    parser.add_argument("--output", metavar="FILE", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        script = synthesize_script(size, args.if_depth, args.string_length, args.number_share, args.seed)
+        size_bytes = len(script.encode("utf-8"))
+        parameters = {"statements": size, "bytes": size_bytes, "if_depth": args.if_depth,
+                      "string_length": args.string_length, "number_share": args.number_share}
+        for name, function in benchmarks(script):
+            tokens = function()
+            record = {"benchmark": name, "size": size, "parameters": parameters, "tokens": tokens}
+            record.update(measure(function, args.repeat))
+            record["tokens_per_second"] = tokens / record["seconds"] if record["seconds"] else 0.0
+            record["bytes_per_second"] = size_bytes / record["seconds"] if record["seconds"] else 0.0
+            results.append(record)
+            print(f"{name:20} size={size:<8} {record['seconds'] * 1000:10.2f} ms "
+                  f"{record['tokens_per_second'] / 1e6:8.2f} Mtok/s {record['bytes_per_second'] / 1e6:8.2f} MB/s "
+                  f"{record['peak_bytes'] / 1024:10.1f} KiB", file=sys.stderr)
+        if args.profile:
+            results.append({"benchmark": "profile", "size": size, "parameters": parameters,
+                            "profile": profile(script)})
+
+    write_report(args, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,51 +17,418 @@ P={
 
 
 
+import argparse
+import hashlib
+import mmap
+import os
 import random
+import sys
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from recognizer import CYKRecognizer, EarleyRecognizer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, match_many falls back to pure Python
+    np = None
+
+EPSILON = "ε"
+
 
 class Grammar:
+    # Automata built by to_finite_automaton, keyed by Grammar.canonical_hash().
+    # Least recently used entries are dropped past _automaton_cache_limit, so a
+    # process loading many grammars does not keep every automaton alive.
+    _automaton_cache = OrderedDict()
+    _automaton_cache_limit = 128
+
     def __init__(self, non_terminals, terminals, productions, start_symbol):
         self.non_terminals = non_terminals
         self.terminals = terminals
         self.productions = productions
         self.start_symbol = start_symbol
+        self._automaton = None
+        self._expansions = None
+        self._length_counts = None
+        self._count_rows = None
+        self._count_symbols = None
+        self._limit = None
+        self._valid_bounds = set()
+        self._recognizers = {}
 
     # Generates a valid string from the grammar
     def generate_string(self):
-        return self._generate_string_from_symbol(self.start_symbol)
-
-    # Helper function to recursively generate a string from a non-terminal symbol
-    def _generate_string_from_symbol(self, symbol):
-        if symbol in self.terminals:
-            return symbol
-
-        # Get possible productions for the non-terminal
-        production_options = self.productions.get(symbol, [])
-        if not production_options:
-            return ""  #no found (error case)
-
-        # Randomly pick a production and expand recursively
-        production = random.choice(production_options)
-        result = []
-        for char in production:
-            result.append(self._generate_string_from_symbol(char))
-        return "".join(result)
-
-    # Converts the Grammar object into a FiniteAutomaton object
+        return next(self.generate_strings(1))
+
+    # Lazily yields `count` strings (endless if count is None) derived from the
+    # start symbol with an explicit stack instead of recursion.
+    # With a seed the output only depends on the seed, so separate processes
+    # given the same seed produce the same stream. Derivations that grow past
+    # max_length are abandoned early and ones shorter than min_length are dropped.
+    # Raises ValueError right away if no string of the language fits the bounds,
+    # and while generating after max_attempts rejected derivations in a row.
+    def generate_strings(self, count=None, seed=None, min_length=0, max_length=None, max_attempts=100000):
+        self._check_length_bounds(min_length, max_length)
+        return self._generate_strings(count, seed, min_length, max_length, max_attempts)
+
+    def _generate_strings(self, count, seed, min_length, max_length, max_attempts):
+        rng = random if seed is None else random.Random(seed)
+        choice = rng.choice
+        terminals = self.terminals
+        expansions = self._reversed_expansions()
+        limit = float("inf") if max_length is None else max_length
+
+        produced = 0
+        rejected = 0
+        while count is None or produced < count:
+            output = []
+            stack = [self.start_symbol]
+            while stack:
+                symbol = stack.pop()
+                if symbol in terminals:
+                    output.append(symbol)
+                    if len(output) > limit:
+                        break
+                elif symbol in expansions:
+                    stack.extend(choice(expansions[symbol]))
+            else:
+                if len(output) >= min_length:
+                    produced += 1
+                    rejected = 0
+                    yield "".join(output)
+                    continue
+            rejected += 1
+            if rejected >= max_attempts:
+                raise ValueError(f"No string with length between {min_length} and {max_length} "
+                                 f"derived in {max_attempts} attempts")
+
+    # Production bodies reversed so they can be pushed on the stack as is, built once
+    def _reversed_expansions(self):
+        if self._expansions is None:
+            self._expansions = {
+                lhs: [tuple(reversed("" if production == EPSILON else production)) for production in options]
+                for lhs, options in self.productions.items() if options
+            }
+        return self._expansions
+
+    # Raises ValueError if the language has no string with a length within the
+    # bounds. Only right-linear grammars can be counted, for the others the
+    # attempt limit of generate_strings is the only guard. Without bounds there
+    # is nothing to check, so plain generation never builds the automaton.
+    # Bounds that passed are remembered on the Grammar.
+    def _check_length_bounds(self, min_length, max_length):
+        if max_length is not None and max_length < min_length:
+            raise ValueError(f"max_length {max_length} is smaller than min_length {min_length}")
+        if (min_length == 0 and max_length is None) or (min_length, max_length) in self._valid_bounds:
+            return
+        try:
+            limit = self._length_limit()
+        except ValueError:
+            return
+        if limit is not None:
+            upper = limit - 1 if max_length is None else min(max_length, limit - 1)
+        elif max_length is None:
+            return
+        else:
+            upper = max_length
+        if not any(self.count(length) for length in range(min_length, upper + 1)):
+            bounds = f"at least {min_length}" if max_length is None else f"between {min_length} and {max_length}"
+            raise ValueError(f"The language has no strings with length {bounds}")
+        self._valid_bounds.add((min_length, max_length))
+
+    # Table of string counts per (automaton state, length), grown on demand and
+    # kept on the Grammar. Counting runs over the determinized automaton rather
+    # than over derivations, so ambiguous grammars are not counted twice.
+    # Rows: counts[length][state]; columns of the compiled automaton are in
+    # symbol order, which gives the lexicographic order used below.
+    # The rows without the column of unknown symbols, and the symbols in column
+    # order, are built once with the table.
+    def _counts_up_to(self, length):
+        if self._length_counts is None:
+            compiled = self.to_finite_automaton().compile()
+            self._count_rows = [row[:compiled.unknown_column] for row in compiled.table]
+            self._count_symbols = sorted(compiled.columns, key=compiled.columns.get)
+            self._length_counts = ([[int(accepting) for accepting in compiled.accepting]], compiled)
+        counts, compiled = self._length_counts
+        rows = self._count_rows
+        while len(counts) <= length:
+            previous = counts[-1]
+            counts.append([sum(previous[target] for target in row) for row in rows])
+        return counts, compiled
+
+    # Number of strings of exactly the given length in the language
+    def count(self, length):
+        counts, compiled = self._counts_up_to(length)
+        return counts[length][compiled.start]
+
+    # True if the language has infinitely many strings
+    def is_infinite(self):
+        return self._length_limit() is None
+
+    # Length past which a finite language has no strings (None if infinite),
+    # computed once. Only the trimmed automaton matters: states reachable from
+    # the start that can still reach an accepting state. The language is
+    # infinite iff those states contain a cycle; otherwise they form a DAG and
+    # the limit is one more than its longest path from the start.
+    def _length_limit(self):
+        if self._limit is None:
+            self._limit = (self._trimmed_longest_path(),)
+        return self._limit[0]
+
+    def _trimmed_longest_path(self):
+        compiled = self.to_finite_automaton().compile()
+        rows = [row[:compiled.unknown_column] for row in compiled.table]
+        predecessors = [[] for _ in rows]
+        for state, row in enumerate(rows):
+            for target in row:
+                predecessors[target].append(state)
+
+        reachable = {compiled.start}
+        stack = [compiled.start]
+        while stack:
+            for target in rows[stack.pop()]:
+                if target not in reachable:
+                    reachable.add(target)
+                    stack.append(target)
+        live = set()
+        stack = [state for state in reachable if compiled.accepting[state]]
+        live.update(stack)
+        while stack:
+            for source in predecessors[stack.pop()]:
+                if source in reachable and source not in live:
+                    live.add(source)
+                    stack.append(source)
+        if compiled.start not in live:
+            return 0
+
+        # Kahn's algorithm: states left unprocessed lie on a cycle
+        incoming = dict.fromkeys(live, 0)
+        for state in live:
+            for target in rows[state]:
+                if target in live:
+                    incoming[target] += 1
+        longest = dict.fromkeys(live, 0)
+        ready = [state for state in live if incoming[state] == 0]
+        processed = 0
+        while ready:
+            state = ready.pop()
+            processed += 1
+            for target in rows[state]:
+                if target in live:
+                    longest[target] = max(longest[target], longest[state] + 1)
+                    incoming[target] -= 1
+                    if incoming[target] == 0:
+                        ready.append(target)
+        if processed < len(live):
+            return None
+        return max(longest[state] for state in live if compiled.accepting[state]) + 1
+
+    # Position of a string in shortlex order (by length, then lexicographically)
+    def rank(self, string):
+        counts, compiled = self._counts_up_to(len(string))
+        result = sum(counts[length][compiled.start] for length in range(len(string)))
+        state = compiled.start
+        for i, symbol in enumerate(string):
+            column = compiled.columns.get(symbol)
+            if column is None:
+                raise ValueError(f"'{string}' is not in the language")
+            remaining = counts[len(string) - i - 1]
+            row = compiled.table[state]
+            result += sum(remaining[row[smaller]] for smaller in range(column))
+            state = row[column]
+        if not compiled.accepting[state]:
+            raise ValueError(f"'{string}' is not in the language")
+        return result
+
+    # String at the given position in shortlex order
+    def unrank(self, index):
+        if index < 0:
+            raise IndexError("rank must be non-negative")
+        limit = self._length_limit()
+        length = 0
+        while limit is None or length < limit:
+            total = self.count(length)
+            if index < total:
+                return self._unrank_with_length(length, index)
+            index -= total
+            length += 1
+        raise IndexError("rank is larger than the language")
+
+    # The index-th string (lexicographically) among those of the given length
+    def _unrank_with_length(self, length, index):
+        counts, compiled = self._counts_up_to(length)
+        rows = self._count_rows
+        symbols = self._count_symbols
+        state = compiled.start
+        output = []
+        for i in range(length):
+            remaining = counts[length - i - 1]
+            row = rows[state]
+            for column, symbol in enumerate(symbols):
+                below = remaining[row[column]]
+                if index < below:
+                    output.append(symbol)
+                    state = row[column]
+                    break
+                index -= below
+        return "".join(output)
+
+    # Lazily yields the language in shortlex order, stops if the language is finite
+    def enumerate_strings(self):
+        limit = self._length_limit()
+        length = 0
+        while limit is None or length < limit:
+            for index in range(self.count(length)):
+                yield self._unrank_with_length(length, index)
+            length += 1
+
+    # Yields `count` strings of exactly the given length (endless if count is None),
+    # each drawn uniformly at random from all such strings of the language
+    def sample_strings(self, length, count=None, seed=None):
+        total = self.count(length)
+        if total == 0:
+            raise ValueError(f"The language has no strings of length {length}")
+        return self._sample_strings(length, total, count, seed)
+
+    def _sample_strings(self, length, total, count, seed):
+        rng = random if seed is None else random.Random(seed)
+        produced = 0
+        while count is None or produced < count:
+            produced += 1
+            yield self._unrank_with_length(length, rng.randrange(total))
+
+    # Membership test that works for any context-free grammar, not only
+    # regular ones. "earley" handles every grammar, "cyk" needs Chomsky normal form.
+    # The recognizer, with its precomputed tables, is kept for later calls.
+    def recognizes(self, input_string, algorithm="earley"):
+        return self._recognizer(algorithm).recognizes(input_string)
+
+    def recognizes_many(self, strings, algorithm="earley"):
+        return self._recognizer(algorithm).recognizes_many(strings)
+
+    def _recognizer(self, algorithm):
+        recognizer = self._recognizers.get(algorithm)
+        if recognizer is None:
+            if algorithm == "earley":
+                recognizer = EarleyRecognizer(self)
+            elif algorithm == "cyk":
+                recognizer = CYKRecognizer(self)
+            else:
+                raise ValueError(f"Unknown algorithm '{algorithm}', expected 'earley' or 'cyk'")
+            self._recognizers[algorithm] = recognizer
+        return recognizer
+
+    # Hash of the grammar that ignores set and dict ordering, so two equal
+    # grammars loaded separately share one cache entry
+    def canonical_hash(self):
+        canonical = (
+            sorted(self.non_terminals),
+            sorted(self.terminals),
+            sorted((lhs, sorted(rhs)) for lhs, rhs in self.productions.items()),
+            self.start_symbol,
+        )
+        return hashlib.sha256(repr(canonical).encode("utf-8")).hexdigest()
+
+    # Converts the Grammar object into a FiniteAutomaton object.
+    # The result is cached and shared between equal grammars, so it must not be mutated.
+    # It is also kept on the instance, so later calls cost nothing; like the
+    # counting tables, it does not follow changes made to the grammar afterwards.
     def to_finite_automaton(self):
-        # Convert production rules to states and transitions for the Finite Automaton
-        #Exmaple set
-        states = set(['q0', 'q1', 'q2'])
-        alphabet = self.terminals
-        transition_function = {
-            'q0': {'a': 'q1', 'b': 'q1', 'c': 'q2'},
-            'q1': {'a': 'q1', 'b': 'q1', 'c': 'q2'},
-            'q2': {'a': 'q1', 'b': 'q1', 'c': 'q2'}
-        }
-        start_state = 'q0'
-        accepting_states = {'q2'}
+        if self._automaton is not None:
+            return self._automaton
+        cache = Grammar._automaton_cache
+        key = self.canonical_hash()
+        automaton = cache.get(key)
+        if automaton is None:
+            automaton = self._build_finite_automaton()
+            cache[key] = automaton
+            if len(cache) > Grammar._automaton_cache_limit:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        self._automaton = automaton
+        return automaton
+
+    # Builds the NFA of the right-linear productions and determinizes it
+    def _build_finite_automaton(self):
+        nfa, nfa_accepting = self._build_nfa()
+
+        # Subset construction, DFA states are named q0, q1, ... in discovery order
+        alphabet = sorted(self.terminals)
+        start = frozenset([self.start_symbol])
+        names = {start: "q0"}
+        queue = [start]
+        transition_function = {}
+        for current in queue:
+            moves = {}
+            for symbol in alphabet:
+                next_set = frozenset(t for state in current for t in nfa.get(state, {}).get(symbol, ()))
+                if not next_set:
+                    continue
+                if next_set not in names:
+                    names[next_set] = f"q{len(names)}"
+                    queue.append(next_set)
+                moves[symbol] = names[next_set]
+            transition_function[names[current]] = moves
+
+        states = set(names.values())
+        accepting_states = {name for subset, name in names.items() if not subset.isdisjoint(nfa_accepting)}
+        return FiniteAutomaton(states, set(self.terminals), transition_function, "q0", accepting_states)
+
+    # NFA of a right-linear grammar: one state per non-terminal plus a final state.
+    # A production wB (w a terminal string) becomes a chain of |w| transitions ending
+    # in B, a production w becomes a chain ending in the final state. Unit and
+    # epsilon productions are folded in by closing over them.
+    # Returns the transitions and the set of accepting NFA states.
+    def _build_nfa(self):
+        final = ("final",)
+        accepting = {final}
+        nfa = {}
+        unit = {}
+        fresh = 0
 
-        return FiniteAutomaton(states, alphabet, transition_function, start_state, accepting_states)
+        def add(state, symbol, target):
+            nfa.setdefault(state, {}).setdefault(symbol, set()).add(target)
+
+        for lhs, options in self.productions.items():
+            for production in options:
+                body = "" if production == EPSILON else production
+                if body and body[-1] in self.non_terminals:
+                    word, target = body[:-1], body[-1]
+                else:
+                    word, target = body, final
+                for symbol in word:
+                    if symbol not in self.terminals:
+                        raise ValueError(f"Production {lhs} -> {production} is not right-linear")
+                if not word:
+                    unit.setdefault(lhs, set()).add(target)
+                    continue
+                state = lhs
+                for symbol in word[:-1]:
+                    fresh += 1
+                    add(state, symbol, ("chain", fresh))
+                    state = ("chain", fresh)
+                add(state, word[-1], target)
+
+        # Replace unit/epsilon productions by copying the moves of every state they reach
+        for lhs in list(unit):
+            closure = set()
+            stack = [lhs]
+            while stack:
+                for target in unit.get(stack.pop(), ()):
+                    if target not in closure:
+                        closure.add(target)
+                        stack.append(target)
+            if final in closure:
+                accepting.add(lhs)
+            for target in closure:
+                for symbol, next_states in list(nfa.get(target, {}).items()):
+                    for next_state in list(next_states):
+                        add(lhs, symbol, next_state)
+
+        return nfa, accepting
 
 
 class FiniteAutomaton:
@@ -71,23 +438,239 @@ class FiniteAutomaton:
         self.transition_function = transition_function
         self.start_state = start_state
         self.accepting_states = accepting_states
+        self._compiled = None
+
+    # Builds (once) the table-driven form of the automaton used for matching.
+    # Call it again with recompile=True after mutating the automaton.
+    def compile(self, recompile=False):
+        if self._compiled is None or recompile:
+            self._compiled = CompiledAutomaton(self)
+        return self._compiled
 
     # Check if a given input string is accepted by the automaton
     def string_belongs_to_language(self, input_string):
-        current_state = self.start_state
+        return self.compile().matches(input_string)
 
+    # Classify a whole batch of strings in one call
+    def match_many(self, strings, vectorize=True):
+        return self.compile().match_many(strings, vectorize)
+
+
+class CompiledAutomaton:
+    """Dense transition table over integer state ids.
+
+    Every symbol of the alphabet gets a column, one extra column catches
+    symbols outside the alphabet, and a dead state absorbs every missing
+    transition, so matching is a single table lookup per character.
+    """
+
+    def __init__(self, automaton):
+        # Sorting keeps the numbering stable between runs
+        state_names = set(automaton.states) | set(automaton.transition_function) | {automaton.start_state}
+        for moves in automaton.transition_function.values():
+            state_names.update(moves.values())
+        state_names = sorted(state_names, key=str)
+        self.state_ids = {name: i for i, name in enumerate(state_names)}
+        self.dead_state = len(state_names)
+
+        symbols = sorted(automaton.alphabet)
+        self.columns = {symbol: i for i, symbol in enumerate(symbols)}
+        self.unknown_column = len(symbols)
+        width = len(symbols) + 1
+
+        self.table = [[self.dead_state] * width for _ in range(self.dead_state + 1)]
+        for state, moves in automaton.transition_function.items():
+            row = self.table[self.state_ids[state]]
+            for symbol, next_state in moves.items():
+                if symbol in self.columns:
+                    row[self.columns[symbol]] = self.state_ids[next_state]
+
+        self.start = self.state_ids[automaton.start_state]
+        self.accepting = [False] * (self.dead_state + 1)
+        for state in automaton.accepting_states:
+            if state in self.state_ids:
+                self.accepting[self.state_ids[state]] = True
+
+        self._np_table = None
+        self._np_lookup = None
+
+    def matches(self, input_string):
+        table = self.table
+        column = self.columns.get
+        unknown = self.unknown_column
+        dead = self.dead_state
+        state = self.start
         for symbol in input_string:
-            if symbol not in self.alphabet:
-                return False
-            if current_state in self.transition_function and symbol in self.transition_function[current_state]:
-                current_state = self.transition_function[current_state][symbol]
-            else:
+            state = table[state][column(symbol, unknown)]
+            if state == dead:
                 return False
+        return self.accepting[state]
+
+    def match_many(self, strings, vectorize=True):
+        strings = list(strings)
+        if vectorize and np is not None and self._build_numpy_tables():
+            return self._match_many_numpy(strings)
+        return [self.matches(s) for s in strings]
+
+    # NumPy tables need every symbol to be a single latin-1 character,
+    # so that inputs can be turned into byte codes without a Python loop
+    def _build_numpy_tables(self):
+        if self._np_table is not None:
+            return True
+        if any(not isinstance(symbol, str) or len(symbol) != 1 or ord(symbol) > 255 for symbol in self.columns):
+            return False
+        self._np_table = np.array(self.table, dtype=np.int32)
+        self._np_lookup = np.full(256, self.unknown_column, dtype=np.int32)
+        for symbol, col in self.columns.items():
+            self._np_lookup[ord(symbol)] = col
+        self._np_accepting = np.array(self.accepting, dtype=bool)
+        return True
+
+    # Strings of equal length are stacked into one matrix and advanced
+    # together, one column of characters per step
+    def _match_many_numpy(self, strings):
+        results = [False] * len(strings)
+        by_length = {}
+        for i, s in enumerate(strings):
+            try:
+                encoded = s.encode('latin-1')
+            except UnicodeEncodeError:
+                results[i] = self.matches(s)
+                continue
+            by_length.setdefault(len(encoded), []).append((i, encoded))
+
+        for length, group in by_length.items():
+            indices = [i for i, _ in group]
+            states = np.full(len(group), self.start, dtype=np.int32)
+            if length:
+                codes = np.frombuffer(b"".join(encoded for _, encoded in group), dtype=np.uint8)
+                columns = self._np_lookup[codes.reshape(len(group), length)]
+                for step in range(length):
+                    states = self._np_table[states, columns[:, step]]
+            accepted = self._np_accepting[states]
+            for i, value in zip(indices, accepted.tolist()):
+                results[i] = value
+        return results
+
+
+# Bulk checking of newline-delimited word lists.
+# Files are memory-mapped and cut into chunks on line boundaries; each worker
+# maps the file itself, so only (start, end) offsets travel to the workers.
+# Standard input has to be sent to them chunk by chunk. Workers send back
+# only counts and accept flags, and at most max_in_flight chunks are pending
+# at any time, so memory stays bounded whatever the input size.
+
+_worker_automaton = None
+
 
-        return current_state in self.accepting_states
+def _init_worker(automaton):
+    global _worker_automaton
+    _worker_automaton = automaton
 
 
-def main():
+# Invalid UTF-8 decodes to U+FFFD, so a line with a bad byte is rejected
+# (unless U+FFFD is in the alphabet) instead of aborting the whole run
+def _split_lines(data):
+    lines = data.decode("utf-8", errors="replace").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+
+# (line count, byte count, accept flags) of a chunk of raw input
+def _check_data(data):
+    lines = _split_lines(data)
+    return len(lines), len(data), _worker_automaton.match_many(lines)
+
+
+def _check_file_chunk(path, start, end):
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return _check_data(mapped[start:end])
+
+
+# Byte ranges of roughly chunk_size bytes, each ending right after a newline
+def _chunk_bounds(mapped, chunk_size):
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = mapped.find(b"\n", min(start + chunk_size, size) - 1)
+        end = size if end == -1 else end + 1
+        yield start, end
+        start = end
+
+
+# Chunks of about chunk_size bytes of a binary stream, ending on a line boundary
+def _stream_chunks(stream, chunk_size):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        if not chunk.endswith(b"\n"):
+            chunk += stream.readline()
+        yield chunk
+
+
+# Results of function(*arguments) for each tuple of arguments, in order. With a
+# pool at most max_in_flight calls are submitted ahead of the one being returned.
+def _ordered_results(pool, function, arguments, max_in_flight):
+    if pool is None:
+        for args in arguments:
+            yield function(*args)
+        return
+    in_flight = deque()
+    try:
+        for args in arguments:
+            in_flight.append(pool.submit(function, *args))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+# Checks every line of `path` ("-" for stdin) and writes "accept"/"reject" per
+# line, in input order, to `output`. Returns throughput statistics.
+def check_file(automaton, path, output, workers=None, chunk_size=1 << 22, max_in_flight=None):
+    automaton.compile()
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    started = time.perf_counter()
+    stats = {"lines": 0, "accepted": 0, "bytes": 0}
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(automaton,)) if workers > 1 else None
+    if pool is None:
+        _init_worker(automaton)
+    try:
+        if path == "-":
+            stream = getattr(sys.stdin, "buffer", sys.stdin)
+            arguments = ((chunk,) for chunk in _stream_chunks(stream, chunk_size))
+            results = _ordered_results(pool, _check_data, arguments, max_in_flight)
+        elif os.path.getsize(path) == 0:
+            results = []
+        else:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                bounds = list(_chunk_bounds(mapped, chunk_size))
+            arguments = ((path, start, end) for start, end in bounds)
+            results = _ordered_results(pool, _check_file_chunk, arguments, max_in_flight)
+        for lines, size, accepted in results:
+            stats["lines"] += lines
+            stats["accepted"] += sum(accepted)
+            stats["bytes"] += size
+            output.write("".join("accept\n" if ok else "reject\n" for ok in accepted))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = elapsed
+    stats["lines_per_second"] = stats["lines"] / elapsed if elapsed else 0.0
+    stats["megabytes_per_second"] = stats["bytes"] / elapsed / 1e6 if elapsed else 0.0
+    return stats
+
+
+def main(argv=None):
     # Define the grammar for Variant 15
     non_terminals = {'S', 'A', 'B'}
     terminals = {'a', 'b', 'c'}
@@ -98,11 +681,30 @@ def main():
     }
     start_symbol = 'S'
 
+    parser = argparse.ArgumentParser(description="Variant 15 grammar and finite automaton")
+    parser.add_argument("--check", metavar="FILE", help="check every line of FILE ('-' for stdin) and exit")
+    parser.add_argument("--output", metavar="FILE", help="where to write accept/reject results (default: stdout)")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
     grammar = Grammar(non_terminals, terminals, productions, start_symbol)
 
+    if args.check:
+        automaton = grammar.to_finite_automaton()
+        output = open(args.output, "w") if args.output else sys.stdout
+        try:
+            stats = check_file(automaton, args.check, output, args.workers)
+        finally:
+            if args.output:
+                output.close()
+        print(f"Checked {stats['lines']} lines, {stats['accepted']} accepted, in {stats['seconds']:.2f}s "
+              f"({stats['lines_per_second']:.0f} lines/s, {stats['megabytes_per_second']:.1f} MB/s)",
+              file=sys.stderr)
+        return
+
     # Generate 5 valid strings from the grammar
     print("Generated strings:")
-    generated_strings = [grammar.generate_string() for _ in range(5)]
+    generated_strings = list(grammar.generate_strings(5))
     for string in generated_strings:
         print(string)
 
@@ -111,8 +713,8 @@ def main():
 
     # Check if generated strings are accepted by the automaton
     print("\nString acceptance check:")
-    for s in generated_strings:
-        print(f"String '{s}' accepted: {automaton.string_belongs_to_language(s)}")
+    for s, accepted in zip(generated_strings, automaton.match_many(generated_strings)):
+        print(f"String '{s}' accepted: {accepted}")
 
 
     while(True):
@@ -0,0 +1,199 @@
+'''
+Membership tests for general (context-free) grammars in the format of
+main.Grammar: productions map a non-terminal to a list of strings, one
+character per symbol, with "ε" or "" for the empty production.
+'''
+
+
+EPSILON = "ε"
+
+
+def _rules(grammar):
+    rules = []
+    for lhs, options in grammar.productions.items():
+        for production in options:
+            rules.append((lhs, tuple("" if production == EPSILON else production)))
+    return rules
+
+
+def _nullable(rules):
+    nullable = set()
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rhs in rules:
+            if lhs not in nullable and all(symbol in nullable for symbol in rhs):
+                nullable.add(lhs)
+                changed = True
+    return nullable
+
+
+class EarleyRecognizer:
+    """Earley recognizer with predictions precomputed per non-terminal.
+
+    Every dotted rule gets an integer id and a chart item is the single int
+    item * (n + 1) + origin, kept in one list and one set per chart position.
+    Prediction adds a precomputed closure of start items for the predicted
+    non-terminal (nullable prefixes already skipped, as in Aycock-Horspool),
+    and these closures are shared by every input checked with the same
+    recognizer.
+    """
+
+    def __init__(self, grammar):
+        rules = _rules(grammar)
+        self.start_symbol = grammar.start_symbol
+        self.non_terminals = set(grammar.non_terminals) | set(grammar.productions)
+        self.nullable = _nullable(rules)
+
+        # Per dotted item: symbol after the dot (None when complete) and rule lhs
+        self.next_symbol = []
+        self.lhs = []
+        first_item = {}
+        for lhs, rhs in rules:
+            first_item.setdefault(lhs, []).append(len(self.next_symbol))
+            for dot in range(len(rhs) + 1):
+                self.next_symbol.append(rhs[dot] if dot < len(rhs) else None)
+                self.lhs.append(lhs)
+
+        self.predictions = {}
+        for symbol in self.non_terminals:
+            closure = []
+            seen = set()
+            stack = [symbol]
+            predicted = {symbol}
+            while stack:
+                for item in first_item.get(stack.pop(), ()):
+                    # Skip over nullable symbols, predicting each of them too
+                    while item not in seen:
+                        seen.add(item)
+                        closure.append(item)
+                        next_symbol = self.next_symbol[item]
+                        if next_symbol not in self.non_terminals:
+                            break
+                        if next_symbol not in predicted:
+                            predicted.add(next_symbol)
+                            stack.append(next_symbol)
+                        if next_symbol not in self.nullable:
+                            break
+                        item += 1
+            self.predictions[symbol] = closure
+
+    def recognizes(self, string):
+        n = len(string)
+        width = n + 1
+        next_symbol = self.next_symbol
+        non_terminals = self.non_terminals
+        nullable = self.nullable
+
+        chart = [[] for _ in range(width)]
+        seen = [set() for _ in range(width)]
+        # waiting[k][A]: items in set k with A after the dot, for completion
+        waiting = [dict() for _ in range(width)]
+
+        def add(k, item, origin):
+            key = item * width + origin
+            if key not in seen[k]:
+                seen[k].add(key)
+                chart[k].append(key)
+
+        for item in self.predictions.get(self.start_symbol, ()):
+            add(0, item, 0)
+
+        for k in range(width):
+            items = chart[k]
+            predicted = set()
+            token = string[k] if k < n else None
+            i = 0
+            while i < len(items):
+                item, origin = divmod(items[i], width)
+                i += 1
+                symbol = next_symbol[item]
+                if symbol is None:
+                    lhs = self.lhs[item]
+                    for waiting_item, waiting_origin in waiting[origin].get(lhs, ()):
+                        add(k, waiting_item + 1, waiting_origin)
+                elif symbol in non_terminals:
+                    waiting[k].setdefault(symbol, []).append((item, origin))
+                    if symbol not in predicted:
+                        predicted.add(symbol)
+                        for predicted_item in self.predictions[symbol]:
+                            add(k, predicted_item, k)
+                    if symbol in nullable:
+                        add(k, item + 1, origin)
+                elif symbol == token:
+                    add(k + 1, item + 1, origin)
+            if k < n and not chart[k + 1]:
+                return False
+
+        for key in chart[n]:
+            item, origin = divmod(key, width)
+            if origin == 0 and next_symbol[item] is None and self.lhs[item] == self.start_symbol:
+                return True
+        return False
+
+    def recognizes_many(self, strings):
+        return [self.recognizes(s) for s in strings]
+
+
+class CYKRecognizer:
+    """CYK recognizer for grammars in Chomsky normal form.
+
+    Rules must be A -> BC or A -> a, plus S -> ε for the start symbol.
+    Each chart cell is an int bitmask over the non-terminals.
+    """
+
+    def __init__(self, grammar):
+        if not self.is_cnf(grammar):
+            raise ValueError("CYK needs a grammar in Chomsky normal form")
+        symbols = sorted(set(grammar.non_terminals) | set(grammar.productions))
+        bit = {symbol: 1 << i for i, symbol in enumerate(symbols)}
+        self.start_mask = bit[grammar.start_symbol]
+        self.accepts_empty = False
+        self.terminal_masks = {}
+        self.binary_rules = []
+        for lhs, rhs in _rules(grammar):
+            if not rhs:
+                self.accepts_empty = True
+            elif len(rhs) == 1:
+                self.terminal_masks[rhs[0]] = self.terminal_masks.get(rhs[0], 0) | bit[lhs]
+            else:
+                self.binary_rules.append((bit[lhs], bit[rhs[0]], bit[rhs[1]]))
+
+    @staticmethod
+    def is_cnf(grammar):
+        non_terminals = set(grammar.non_terminals) | set(grammar.productions)
+        for lhs, rhs in _rules(grammar):
+            if not rhs:
+                if lhs != grammar.start_symbol:
+                    return False
+            elif len(rhs) == 1:
+                if rhs[0] in non_terminals:
+                    return False
+            elif len(rhs) != 2 or not all(symbol in non_terminals for symbol in rhs) \
+                    or grammar.start_symbol in rhs:
+                return False
+        return True
+
+    def recognizes(self, string):
+        n = len(string)
+        if n == 0:
+            return self.accepts_empty
+        # table[length - 1][i]: non-terminals deriving string[i:i + length]
+        table = [[self.terminal_masks.get(symbol, 0) for symbol in string]]
+        for length in range(2, n + 1):
+            row = []
+            for i in range(n - length + 1):
+                cell = 0
+                for split in range(1, length):
+                    left = table[split - 1][i]
+                    right = table[length - split - 1][i + split]
+                    if left and right:
+                        for lhs, first, second in self.binary_rules:
+                            if left & first and right & second:
+                                cell |= lhs
+                row.append(cell)
+            table.append(row)
+        return bool(table[n - 1][0] & self.start_mask)
+
+    def recognizes_many(self, strings):
+        return [self.recognizes(s) for s in strings]
@@ -0,0 +1,164 @@
+'''
+Grammar analysis for the automata of main2.py.
+
+Productions are kept as tuples of symbols, so state names of any length
+stay unambiguous, and every algorithm below runs in time linear in the
+total size of the grammar.
+'''
+
+
+from collections import defaultdict
+
+EPSILON = "ε"
+
+
+class Production:
+    """A rule lhs -> rhs, both sides are tuples of symbols (rhs () is ε)."""
+    __slots__ = ("lhs", "rhs")
+
+    def __init__(self, lhs, rhs):
+        self.lhs = tuple(lhs)
+        self.rhs = tuple(rhs)
+
+    def __eq__(self, other):
+        return isinstance(other, Production) and self.lhs == other.lhs and self.rhs == other.rhs
+
+    def __hash__(self):
+        return hash((self.lhs, self.rhs))
+
+    def __repr__(self):
+        return f"Production({self.lhs!r}, {self.rhs!r})"
+
+    def __str__(self):
+        rhs = ' '.join(map(str, self.rhs)) if self.rhs else EPSILON
+        return f"{' '.join(map(str, self.lhs))} -> {rhs}"
+
+
+class Grammar:
+    def __init__(self, non_terminals, terminals, productions, start_symbol):
+        self.non_terminals = set(non_terminals)
+        self.terminals = set(terminals)
+        self.productions = list(productions)
+        self.start_symbol = start_symbol
+
+        # Indexes: productions by left-hand side, and every occurrence of a
+        # symbol on a right-hand side as a production index (once per occurrence)
+        self.by_lhs = defaultdict(list)
+        self.occurrences = defaultdict(list)
+        for i, production in enumerate(self.productions):
+            self.by_lhs[production.lhs].append(i)
+            for symbol in production.rhs:
+                self.occurrences[symbol].append(i)
+
+    @classmethod
+    def from_rules(cls, rules, non_terminals, terminals, start_symbol):
+        """Build from {lhs: [rhs, ...]} where each rhs is a sequence of symbols.
+
+        Strings are split into single-character symbols, like the grammars of
+        lab1; "ε" and "" stand for the empty right-hand side.
+        """
+        productions = []
+        for lhs, options in rules.items():
+            for rhs in options:
+                productions.append(Production((lhs,), () if rhs in (EPSILON, "") else tuple(rhs)))
+        return cls(non_terminals, terminals, productions, start_symbol)
+
+    def rules(self):
+        """Productions grouped as {lhs: [rhs, ...]}, in insertion order."""
+        return {lhs: [self.productions[i].rhs for i in indices] for lhs, indices in self.by_lhs.items()}
+
+    def _saturate(self, counts, ready):
+        """Shared worklist for productive and nullable symbols.
+
+        counts[i] is the number of right-hand side occurrences production i
+        still waits for (None if it can never fire). A context-free production
+        fires when its count drops to zero and marks its left-hand side. Every
+        occurrence is decremented at most once, so the cost is linear.
+        """
+        found = set()
+        worklist = []
+
+        def fire(i):
+            lhs = self.productions[i].lhs
+            if len(lhs) == 1 and lhs[0] not in found:
+                found.add(lhs[0])
+                worklist.append(lhs[0])
+
+        for i in ready:
+            fire(i)
+        while worklist:
+            symbol = worklist.pop()
+            for i in self.occurrences.get(symbol, ()):
+                if counts[i] is not None:
+                    counts[i] -= 1
+                    if counts[i] == 0:
+                        fire(i)
+        return found
+
+    def productive_symbols(self):
+        """Non-terminals that derive at least one terminal string."""
+        counts = [sum(1 for symbol in p.rhs if symbol in self.non_terminals) for p in self.productions]
+        return self._saturate(counts, [i for i, count in enumerate(counts) if count == 0])
+
+    def nullable_symbols(self):
+        """Non-terminals that derive the empty string."""
+        counts = [None if any(symbol in self.terminals for symbol in p.rhs) else len(p.rhs)
+                  for p in self.productions]
+        return self._saturate(counts, [i for i, count in enumerate(counts) if count == 0])
+
+    def reachable_symbols(self):
+        """Symbols that occur in some sentential form derived from the start symbol."""
+        reachable = {self.start_symbol}
+        stack = [self.start_symbol]
+        while stack:
+            symbol = stack.pop()
+            for i in self.by_lhs.get((symbol,), ()):
+                for next_symbol in self.productions[i].rhs:
+                    if next_symbol not in reachable:
+                        reachable.add(next_symbol)
+                        stack.append(next_symbol)
+        return reachable
+
+    def remove_useless(self):
+        """Equivalent grammar without unproductive and unreachable symbols.
+
+        Unproductive symbols go first, then whatever became unreachable, which
+        is the order that guarantees every remaining symbol is useful.
+        """
+        productive = self.productive_symbols()
+
+        def keep(p):
+            return all(symbol in productive or symbol in self.terminals for symbol in p.lhs + p.rhs)
+
+        trimmed = Grammar(productive, self.terminals, filter(keep, self.productions), self.start_symbol)
+        reachable = trimmed.reachable_symbols()
+        productions = [p for p in trimmed.productions if all(symbol in reachable for symbol in p.lhs)]
+        return Grammar(productive & reachable, self.terminals & reachable, productions, self.start_symbol)
+
+    def classify(self):
+        """Classify grammar based on Chomsky hierarchy."""
+        context_free = True
+        right_linear = left_linear = True
+        monotone = True
+        start_on_rhs = bool(self.occurrences.get(self.start_symbol))
+
+        for p in self.productions:
+            if len(p.lhs) != 1 or p.lhs[0] not in self.non_terminals:
+                context_free = False
+            if len(p.rhs) < len(p.lhs) and not (p.lhs == (self.start_symbol,) and not p.rhs and not start_on_rhs):
+                monotone = False
+            if context_free:
+                # Right-linear: terminals then at most one trailing non-terminal, left-linear mirrored
+                inner = [symbol in self.non_terminals for symbol in p.rhs]
+                if any(inner[:-1]):
+                    right_linear = False
+                if any(inner[1:]):
+                    left_linear = False
+
+        if context_free and (right_linear or left_linear):
+            return "Type 3 (Regular Grammar)"
+        if context_free:
+            return "Type 2 (Context-Free Grammar)"
+        if monotone:
+            return "Type 1 (Context-Sensitive Grammar)"
+        return "Type 0 (Unrestricted Grammar)"
@@ -12,8 +12,21 @@ F = {q3},
 '''
 
 
-from collections import defaultdict, deque
-import matplotlib.pyplot as plt
+import argparse
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from html import escape
+
+from grammar import Grammar, Production
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, BitParallelNFA falls back to Python ints
+    np = None
 
 class FiniteAutomaton:
     def __init__(self, states, alphabet, transitions, start_state, final_states):
@@ -31,77 +44,496 @@ class FiniteAutomaton:
         return True
 
     def to_regular_grammar(self):
-        """Convert FA to Regular Grammar."""
-        rules = defaultdict(list)
+        """Convert FA to Regular Grammar.
+
+        Returns a grammar.Grammar whose productions are symbol tuples, so
+        multi-character state names stay unambiguous.
+        """
+        productions = []
 
         for (state, symbol), next_states in self.transitions.items():
             for next_state in next_states:
-                rules[state].append(f"{symbol}{next_state}")
+                productions.append(Production((state,), (symbol, next_state)))
 
         # Add ε (epsilon) production for final states
         for final_state in self.final_states:
-            rules[final_state].append("ε")
+            productions.append(Production((final_state,), ()))
 
-        return dict(rules)
+        return Grammar(self._number_states(), self.alphabet, productions, self.start_state)
 
     def classify_grammar(self):
         """Classify grammar based on Chomsky hierarchy."""
-        # Since we're using finite automata, it must be Type 3 (Regular Grammar)
-        return "Type 3 (Regular Grammar)"
+        return self.to_regular_grammar().classify()
 
     def convert_ndfa_to_dfa(self):
-        """Convert NDFA to DFA using subset construction."""
+        """Convert NDFA to DFA using subset construction.
+
+        NFA states are numbered and every subset is kept as an integer bitmask,
+        so a DFA transition is the OR of the precomputed successor masks of the
+        subset's members. Masks are interned to one frozenset of state names per
+        DFA state, and each DFA transition maps to a one-element list, like any
+        other transitions of this class.
+        """
+        numbering, successors, final_mask = self._successor_masks()
+        order = sorted(numbering, key=numbering.get)
+        symbols = sorted(self.alphabet)
+
+        start_mask = 1 << numbering[self.start_state]
+        interned = {start_mask: frozenset([self.start_state])}
+        queue = [start_mask]
         dfa_transitions = {}
-        start = frozenset([self.start_state])
-        queue = deque([start])
-        visited = {start}
-
-        while queue:
-            current = queue.popleft()
-
-            for symbol in self.alphabet:
-                next_states = set()
 
-                for state in current:
-                    next_states.update(self.transitions.get((state, symbol), []))
+        for current in queue:
+            members = self._mask_members(current)
+            current_states = interned[current]
 
-                next_states_frozen = frozenset(next_states)
+            for symbol in symbols:
+                row = successors[symbol]
+                mask = 0
+                for member in members:
+                    mask |= row[member]
 
-                if next_states:
-                    dfa_transitions[(current, symbol)] = next_states_frozen
-                    if next_states_frozen not in visited:
-                        visited.add(next_states_frozen)
-                        queue.append(next_states_frozen)
+                if mask:
+                    next_states = interned.get(mask)
+                    if next_states is None:
+                        next_states = frozenset(order[i] for i in self._mask_members(mask))
+                        interned[mask] = next_states
+                        queue.append(mask)
+                    dfa_transitions[(current_states, symbol)] = [next_states]
 
         # Determine final states for DFA
-        dfa_final_states = {state for state in visited if any(s in self.final_states for s in state)}
+        dfa_final_states = {interned[mask] for mask in interned if mask & final_mask}
+
+        return FiniteAutomaton(set(interned.values()), self.alphabet, dfa_transitions,
+                               interned[start_mask], dfa_final_states)
+
+    def save(self, path):
+        """Write the FA to path in the binary format read by FiniteAutomaton.load.
+
+        Non-deterministic automata are determinized first. States are stored
+        by their state_label, in the order of _number_states.
+        """
+        dfa = self if self.is_deterministic() else self.convert_ndfa_to_dfa()
+        numbering = dfa._number_states()
+        order = sorted(numbering, key=numbering.get)
+        symbols = sorted(dfa.alphabet)
+        columns = {symbol: i for i, symbol in enumerate(symbols)}
+
+        table = [-1] * (len(order) * len(symbols))
+        for (state, symbol), next_states in dfa.transitions.items():
+            if symbol in columns and next_states:
+                table[numbering[state] * len(symbols) + columns[symbol]] = numbering[next_states[0]]
+        bitmap = bytearray((len(order) + 7) // 8)
+        for state in dfa.final_states:
+            if state in numbering:
+                bitmap[numbering[state] // 8] |= 1 << (numbering[state] % 8)
+
+        strings = bytearray()
+        for text in [str(symbol) for symbol in symbols] + [dfa.state_label(state) for state in order]:
+            encoded = text.encode("utf-8")
+            strings += struct.pack("<I", len(encoded)) + encoded
+        strings += bytes(-(_HEADER.size + len(strings)) % 8)
+
+        with open(path, "wb") as out:
+            out.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, 0, len(order), len(symbols),
+                                   numbering[dfa.start_state], len(strings)))
+            out.write(strings)
+            out.write(struct.pack(f"<{len(table)}i", *table))
+            out.write(bitmap)
+
+    @staticmethod
+    def load(path):
+        """Map a file written by save() read-only, see MappedDFA."""
+        return MappedDFA(path)
+
+    def intersection(self, other):
+        """DFA accepting the strings accepted by both automata."""
+        return self._product_automaton([other], lambda a, b: a and b)
+
+    def union(self, other):
+        """DFA accepting the strings accepted by either automaton."""
+        return self._product_automaton([other], lambda a, b: a or b)
+
+    def difference(self, other):
+        """DFA accepting the strings accepted by this automaton but not by other."""
+        return self._product_automaton([other], lambda a, b: a and not b)
+
+    def complement(self):
+        """DFA accepting the strings over this alphabet that this automaton rejects."""
+        return self._product_automaton([], lambda a: not a)
+
+    def is_empty(self):
+        """True if the automaton accepts no string at all."""
+        return not any(accepting for _, accepting in self._explore_product([], lambda a: a))
+
+    def is_subset_of(self, other):
+        """True if every string accepted here is accepted by other.
+
+        The difference product is explored breadth-first and the search stops
+        at the first string that only this automaton accepts.
+        """
+        return not any(accepting for _, accepting in self._explore_product([other], lambda a, b: a and not b))
+
+    def is_equivalent(self, other):
+        """True if both automata accept the same language.
+
+        Uses the Hopcroft-Karp union-find check on the lazily determinized
+        automata: states reached by the same strings are merged, and the check
+        fails as soon as a merged pair disagrees on acceptance. Nothing is
+        minimized and only pairs reachable from the start are visited.
+        """
+        left, right = self.lazy_dfa(), other.lazy_dfa()
+        symbols = sorted(set(self.alphabet) | set(other.alphabet))
+        parent = {}
+
+        def find(node):
+            root = node
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while node != root:
+                parent[node], node = root, parent.get(node, node)
+            return root
+
+        start = (("L", left.start_mask), ("R", right.start_mask))
+        parent[start[0]] = start[1]
+        queue = [start]
+        for (_, left_mask), (_, right_mask) in queue:
+            if left.is_final(left_mask) != right.is_final(right_mask):
+                return False
+            for symbol in symbols:
+                left_next = ("L", left.transition(left_mask, symbol))
+                right_next = ("R", right.transition(right_mask, symbol))
+                left_root, right_root = find(left_next), find(right_next)
+                if left_root != right_root:
+                    parent[left_root] = right_root
+                    queue.append((left_next, right_next))
+        return True
 
-        return FiniteAutomaton(visited, self.alphabet, dfa_transitions, start, dfa_final_states)
+    def _explore_product(self, others, accept, transitions=None):
+        """Breadth-first walk over the product of this and the other automata.
+
+        Each automaton is determinized lazily and a product state is the tuple
+        of their subset masks. Yields (name, accepting) for every reachable
+        product state as it is discovered, so callers can stop early; names
+        are q0, q1, ... in discovery order. When given, transitions is filled
+        with the product's moves. The state where every automaton is stuck is
+        left out unless accept makes it accepting.
+        """
+        automata = [self] + list(others)
+        matchers = [fa.lazy_dfa() for fa in automata]
+        symbols = sorted(set().union(*(fa.alphabet for fa in automata)))
+        sink = tuple(0 for _ in matchers)
+        sink_accepting = accept(*(False for _ in matchers))
+
+        start = tuple(m.start_mask for m in matchers)
+        names = {start: "q0"}
+        queue = [start]
+        for current in queue:
+            yield names[current], accept(*(m.is_final(mask) for m, mask in zip(matchers, current)))
+            for symbol in symbols:
+                next_state = tuple(m.transition(mask, symbol) for m, mask in zip(matchers, current))
+                if next_state == sink and not sink_accepting:
+                    continue
+                if next_state not in names:
+                    names[next_state] = f"q{len(names)}"
+                    queue.append(next_state)
+                if transitions is not None:
+                    transitions[(names[current], symbol)] = [names[next_state]]
+
+    def _product_automaton(self, others, accept):
+        transitions = {}
+        states = set()
+        final_states = set()
+        for name, accepting in self._explore_product(others, accept, transitions):
+            states.add(name)
+            if accepting:
+                final_states.add(name)
+        alphabet = set(self.alphabet).union(*(fa.alphabet for fa in others))
+        return FiniteAutomaton(states, alphabet, transitions, "q0", final_states)
+
+    def lazy_dfa(self, max_states=10000):
+        """Matcher that determinizes on the fly, see LazyDFA."""
+        return LazyDFA(self, max_states)
+
+    def bit_parallel(self):
+        """Matcher that simulates the NFA directly, see BitParallelNFA."""
+        return BitParallelNFA(self)
+
+    def _successor_masks(self):
+        """State numbering, per-symbol successor masks and the final-state mask.
+
+        successors[symbol][i] has bit j set when state j is reachable from
+        state i on symbol.
+        """
+        numbering = self._number_states()
+        successors = {symbol: [0] * len(numbering) for symbol in self.alphabet}
+        for (state, symbol), next_states in self.transitions.items():
+            if symbol in successors:
+                row = successors[symbol]
+                for next_state in next_states:
+                    row[numbering[state]] |= 1 << numbering[next_state]
+
+        final_mask = 0
+        for state in self.final_states:
+            if state in numbering:
+                final_mask |= 1 << numbering[state]
+        return numbering, successors, final_mask
+
+    def _number_states(self):
+        """Map every state, including ones only named in transitions, to 0..n-1."""
+        states = set(self.states) | {self.start_state}
+        for (state, _), next_states in self.transitions.items():
+            states.add(state)
+            states.update(next_states)
+        return {state: i for i, state in enumerate(sorted(states, key=str))}
+
+    @staticmethod
+    def _mask_members(mask):
+        """Indices of the set bits of mask, lowest first."""
+        members = []
+        while mask:
+            low = mask & -mask
+            members.append(low.bit_length() - 1)
+            mask ^= low
+        return members
+
+    def minimize(self):
+        """Return the minimal DFA for the language of this automaton.
+
+        Non-deterministic automata are determinized first. Unreachable and dead
+        states are pruned, then Hopcroft's partition refinement merges
+        equivalent states. The result's states are renamed q0, q1, ... in
+        breadth-first order from the start state over the sorted alphabet, so
+        equal languages give identical automata.
+        """
+        dfa = self if self.is_deterministic() else self.convert_ndfa_to_dfa()
+        symbols = sorted(dfa.alphabet)
+        numbering = dfa._number_states()
+        order = sorted(numbering, key=numbering.get)
+
+        # Dense table, index n is an explicit sink that completes the DFA
+        sink = len(order)
+        delta = {symbol: [sink] * (sink + 1) for symbol in symbols}
+        for (state, symbol), next_states in dfa.transitions.items():
+            if symbol in delta and next_states:
+                delta[symbol][numbering[state]] = numbering[next_states[0]]
+        final = [False] * (sink + 1)
+        for state in dfa.final_states:
+            if state in numbering:
+                final[numbering[state]] = True
+
+        # Keep states reachable from the start that can still reach a final state
+        reachable = self._closure([numbering[dfa.start_state]],
+                                  lambda q: [delta[symbol][q] for symbol in symbols])
+        inverse = {symbol: [[] for _ in range(sink + 1)] for symbol in symbols}
+        for symbol in symbols:
+            for q, target in enumerate(delta[symbol]):
+                inverse[symbol][target].append(q)
+        live = self._closure([q for q in range(sink) if final[q]],
+                             lambda q: [p for symbol in symbols for p in inverse[symbol][q]])
+        useful = (reachable & live) - {sink}
+        start = numbering[dfa.start_state]
+        if start not in useful:
+            return FiniteAutomaton({"q0"}, self.alphabet, {}, "q0", set())
+
+        # Pruned states start out in the sink's block, only useful ones are ever named
+        blocks = [set(), set(), set()]
+        for q in range(sink + 1):
+            blocks[2 if q not in useful else 0 if final[q] else 1].add(q)
+        blocks = [block for block in blocks if block]
+        block_of = [len(blocks) - 1] * (sink + 1)
+        for b, block in enumerate(blocks):
+            for q in block:
+                block_of[q] = b
+
+        worklist = {(b, symbol) for b in range(len(blocks) - 1) for symbol in symbols}
+        while worklist:
+            splitter, symbol = worklist.pop()
+            predecessors = set()
+            for q in blocks[splitter]:
+                predecessors.update(inverse[symbol][q])
+
+            hit = {}
+            for q in predecessors:
+                hit.setdefault(block_of[q], set()).add(q)
+
+            for b, inside in hit.items():
+                if len(inside) == len(blocks[b]):
+                    continue
+                blocks[b] -= inside
+                new = len(blocks)
+                blocks.append(inside)
+                for q in inside:
+                    block_of[q] = new
+                smaller = new if len(inside) <= len(blocks[b]) else b
+                for c in symbols:
+                    worklist.add((new, c) if (b, c) in worklist else (smaller, c))
+
+        # Canonical renumbering by breadth-first search over the quotient automaton
+        sink_block = block_of[sink]
+        names = {block_of[start]: "q0"}
+        queue = [block_of[start]]
+        transitions = {}
+        for b in queue:
+            representative = next(iter(blocks[b]))
+            for symbol in symbols:
+                target = block_of[delta[symbol][representative]]
+                if target == sink_block:
+                    continue
+                if target not in names:
+                    names[target] = f"q{len(names)}"
+                    queue.append(target)
+                transitions[(names[b], symbol)] = [names[target]]
+
+        final_states = {name for b, name in names.items() if final[next(iter(blocks[b]))]}
+        return FiniteAutomaton(set(names.values()), self.alphabet, transitions, "q0", final_states)
+
+    @staticmethod
+    def _closure(seeds, neighbours):
+        """All nodes reachable from seeds by following neighbours."""
+        seen = set(seeds)
+        stack = list(seeds)
+        while stack:
+            for nxt in neighbours(stack.pop()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def state_label(self, state):
+        """Printable name of a state, DFA subsets are shown as q0,q1."""
+        if isinstance(state, frozenset):
+            return ','.join(sorted(map(str, state)))
+        return str(state)
+
+    def grouped_edges(self):
+        """Yield (state, next_state, symbols) with parallel transitions merged."""
+        edges = defaultdict(list)
+        for (state, symbol), next_states in self.transitions.items():
+            for next_state in next_states:
+                edges[(state, next_state)].append(symbol)
+        for (state, next_state), symbols in edges.items():
+            yield state, next_state, sorted(symbols)
+
+    def layout(self):
+        """Position states in columns by breadth-first distance from the start."""
+        numbering = self._number_states()
+        neighbours = defaultdict(list)
+        for (state, _), next_states in self.transitions.items():
+            neighbours[state].extend(next_states)
+
+        depth = {self.start_state: 0}
+        queue = [self.start_state]
+        for state in queue:
+            for next_state in sorted(neighbours[state], key=numbering.get):
+                if next_state not in depth:
+                    depth[next_state] = depth[state] + 1
+                    queue.append(next_state)
+        last = max(depth.values()) + 1
+        for state in sorted(numbering, key=numbering.get):
+            depth.setdefault(state, last)
+
+        rows = defaultdict(int)
+        positions = {}
+        for state in sorted(numbering, key=lambda q: (depth[q], numbering[q])):
+            positions[state] = (depth[state], rows[depth[state]])
+            rows[depth[state]] += 1
+        return positions
+
+    def write_dot(self, target):
+        """Write the FA as a Graphviz DOT graph to a path or text file object."""
+        numbering = self._number_states()
+        with _open_output(target) as out:
+            out.write("digraph FA {\n    rankdir=LR;\n    start [shape=point];\n")
+            for state in sorted(numbering, key=numbering.get):
+                shape = "doublecircle" if state in self.final_states else "circle"
+                label = _dot_quote(self.state_label(state))
+                out.write(f'    n{numbering[state]} [shape={shape}, label="{label}"];\n')
+            out.write(f"    start -> n{numbering[self.start_state]};\n")
+            for state, next_state, symbols in self.grouped_edges():
+                label = _dot_quote(','.join(symbols))
+                out.write(f'    n{numbering[state]} -> n{numbering[next_state]} [label="{label}"];\n')
+            out.write("}\n")
+
+    def write_svg(self, target):
+        """Write the FA as a standalone SVG image to a path or text file object.
+
+        Needs no plotting library, states are laid out by layout() and
+        parallel transitions share one labeled arrow.
+        """
+        positions = self.layout()
+        step_x, step_y, radius, margin = 120, 80, 24, 80
+
+        def centre(state):
+            column, row = positions[state]
+            return margin + column * step_x, margin + row * step_y
+
+        width = margin * 2 + step_x * max(column for column, _ in positions.values())
+        height = margin * 2 + step_y * max(row for _, row in positions.values())
+        with _open_output(target) as out:
+            out.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                      f'font-family="sans-serif" font-size="12">\n')
+            out.write('<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" '
+                      'markerHeight="8" orient="auto"><path d="M0,0 L10,5 L0,10 z"/></marker></defs>\n')
+
+            start_x, start_y = centre(self.start_state)
+            out.write(f'<line x1="{start_x - radius - 30}" y1="{start_y}" x2="{start_x - radius}" y2="{start_y}" '
+                      f'stroke="green" marker-end="url(#arrow)"/>\n')
+
+            for state, next_state, symbols in self.grouped_edges():
+                x1, y1 = centre(state)
+                x2, y2 = centre(next_state)
+                label = escape(','.join(symbols))
+                if state == next_state:
+                    out.write(f'<path d="M{x1 - 10},{y1 - radius} C{x1 - 30},{y1 - radius - 40} '
+                              f'{x1 + 30},{y1 - radius - 40} {x1 + 10},{y1 - radius}" fill="none" '
+                              f'stroke="blue" marker-end="url(#arrow)"/>\n')
+                    out.write(f'<text x="{x1}" y="{y1 - radius - 34}" text-anchor="middle" '
+                              f'fill="blue">{label}</text>\n')
+                    continue
+                length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+                dx, dy = (x2 - x1) / length, (y2 - y1) / length
+                # Bend the curve sideways so opposite edges between two states don't overlap
+                mid_x, mid_y = (x1 + x2) / 2 - dy * 20, (y1 + y2) / 2 + dx * 20
+                out.write(f'<path d="M{x1 + dx * radius:.1f},{y1 + dy * radius:.1f} Q{mid_x:.1f},{mid_y:.1f} '
+                          f'{x2 - dx * radius:.1f},{y2 - dy * radius:.1f}" fill="none" stroke="blue" '
+                          f'marker-end="url(#arrow)"/>\n')
+                out.write(f'<text x="{mid_x:.1f}" y="{mid_y:.1f}" text-anchor="middle" fill="blue">{label}</text>\n')
+
+            for state in positions:
+                x, y = centre(state)
+                fill = "red" if state in self.final_states else "white"
+                out.write(f'<circle cx="{x}" cy="{y}" r="{radius}" fill="{fill}" stroke="black"/>\n')
+                out.write(f'<text x="{x}" y="{y + 4}" text-anchor="middle">{escape(self.state_label(state))}</text>\n')
+            out.write("</svg>\n")
 
     def visualize(self):
         """Visualize the FA using matplotlib."""
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(8, 6))
-        pos = {state: (i*2, 0) for i, state in enumerate(self.states)}
+        pos = {state: (column * 3, -row * 2) for state, (column, row) in self.layout().items()}
 
         # Plot states
-        for state in self.states:
-            x, y = pos[state]
+        for state, (x, y) in pos.items():
             color = 'red' if state in self.final_states else 'white'
             circle = plt.Circle((x, y), 0.5, color=color, ec='black', zorder=2)
             plt.gca().add_patch(circle)
-            plt.text(x, y, state, fontsize=12, ha='center', va='center', zorder=3)
-
-        # Plot transitions
-        for (state, symbol), next_states in self.transitions.items():
-            for next_state in next_states:
-                x1, y1 = pos[state]
-                x2, y2 = pos[next_state]
-
-                plt.arrow(x1, y1, x2 - x1 - 0.5, y2 - y1,
-                          length_includes_head=True, head_width=0.2, fc='blue', ec='blue')
-                mid_x = (x1 + x2) / 2
-                mid_y = (y1 + y2) / 2
-                plt.text(mid_x, mid_y + 0.2, symbol, color='blue', fontsize=10)
+            plt.text(x, y, self.state_label(state), fontsize=12, ha='center', va='center', zorder=3)
+
+        # Plot transitions, one arrow per pair of states
+        for state, next_state, symbols in self.grouped_edges():
+            x1, y1 = pos[state]
+            x2, y2 = pos[next_state]
+            label = ','.join(symbols)
+
+            if state == next_state:
+                plt.text(x1, y1 + 0.7, label, color='blue', fontsize=10, ha='center')
+                continue
+            plt.annotate("", xy=(x2, y2), xytext=(x1, y1),
+                         arrowprops=dict(arrowstyle="->", color='blue', shrinkA=15, shrinkB=15,
+                                         connectionstyle="arc3,rad=0.2"))
+            plt.text((x1 + x2) / 2, (y1 + y2) / 2 + 0.2, label, color='blue', fontsize=10)
 
         # Starting state arrow
         start_x, start_y = pos[self.start_state]
@@ -114,46 +546,373 @@ class FiniteAutomaton:
         plt.show()
 
 
-# Variant 15 Definition
-states = {'q0', 'q1', 'q2', 'q3'}
-alphabet = {'a', 'b', 'c'}
-transitions = {
-    ('q0', 'a'): ['q0', 'q1'],
-    ('q1', 'b'): ['q2'],
-    ('q2', 'a'): ['q2'],
-    ('q2', 'b'): ['q3'],
-    ('q2', 'c'): ['q0']
-}
-start_state = 'q0'
-final_states = {'q3'}
-
-# Instantiate FA
-fa = FiniteAutomaton(states, alphabet, transitions, start_state, final_states)
-
-# Check if DFA
-is_dfa = fa.is_deterministic()
-print(f"Is the FA deterministic? {'Yes' if is_dfa else 'No'}")
-
-# Convert to Regular Grammar
-regular_grammar = fa.to_regular_grammar()
-print("\nRegular Grammar Production Rules:")
-for state, productions in regular_grammar.items():
-    for prod in productions:
-        print(f"{state} -> {prod}")
-
-# Grammar classification
-grammar_type = fa.classify_grammar()
-print(f"\nGrammar Type: {grammar_type}")
-
-# Convert NDFA to DFA if necessary
-if not is_dfa:
-    dfa = fa.convert_ndfa_to_dfa()
-    print("\nConverted DFA Transitions:")
-    for (state_set, symbol), next_state_set in dfa.transitions.items():
-        current = ','.join(state_set)
-        next_state = ','.join(next_state_set)
-        print(f"({current}, {symbol}) -> {next_state}")
-
-# Visualize the FA
-fa.visualize()
-
+def _dot_quote(text):
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+@contextmanager
+def _open_output(target):
+    """Use target as a text file object, opening (and closing) it if it is a path."""
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, "w", encoding="utf-8") as out:
+            yield out
+    else:
+        yield target
+
+
+_MAGIC = b"LFA\x00"
+_FORMAT_VERSION = 1
+# magic, version, reserved, states, symbols, start state, size of the string section
+_HEADER = struct.Struct("<4sHHIIII")
+
+
+class MappedDFA:
+    """DFA matcher reading a file written by FiniteAutomaton.save through mmap.
+
+    The file holds a header, a string section (symbols, then state names,
+    each length prefixed), a dense little-endian int32 transition table with
+    -1 for missing transitions, and a bitmap of accepting states. Only the
+    header and the symbols are decoded; the table is used in place, so
+    processes mapping the same file share its pages.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.state_count, symbol_count, self.start, strings_size = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a saved finite automaton")
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {version}, expected {_FORMAT_VERSION}")
+
+        self._strings_offset = _HEADER.size
+        offset = self._strings_offset
+        self.symbols = []
+        for _ in range(symbol_count):
+            text, offset = self._read_string(offset)
+            self.symbols.append(text)
+        self.columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        table_offset = _HEADER.size + strings_size
+        table_size = 4 * self.state_count * symbol_count
+        table = memoryview(self._map)[table_offset:table_offset + table_size]
+        self.table = table.cast("i") if sys.byteorder == "little" else struct.unpack(f"<{len(table) // 4}i", table)
+        bitmap_offset = table_offset + table_size
+        self.accepting = memoryview(self._map)[bitmap_offset:bitmap_offset + (self.state_count + 7) // 8]
+
+    def _read_string(self, offset):
+        (size,) = struct.unpack_from("<I", self._map, offset)
+        offset += 4
+        return self._map[offset:offset + size].decode("utf-8"), offset + size
+
+    def is_accepting(self, state):
+        return bool(self.accepting[state // 8] & (1 << (state % 8)))
+
+    def accepts(self, input_string):
+        table = self.table
+        columns = self.columns
+        width = len(self.symbols)
+        state = self.start
+        for symbol in input_string:
+            column = columns.get(symbol)
+            if column is None:
+                return False
+            state = table[state * width + column]
+            if state < 0:
+                return False
+        return self.is_accepting(state)
+
+    def accepts_many(self, strings):
+        return [self.accepts(s) for s in strings]
+
+    def to_automaton(self):
+        """Decode the whole file back into a FiniteAutomaton."""
+        offset = self._strings_offset
+        for _ in self.symbols:
+            _, offset = self._read_string(offset)
+        names = []
+        for _ in range(self.state_count):
+            name, offset = self._read_string(offset)
+            names.append(name)
+
+        width = len(self.symbols)
+        transitions = {}
+        for state, name in enumerate(names):
+            for column, symbol in enumerate(self.symbols):
+                target = self.table[state * width + column]
+                if target >= 0:
+                    transitions[(name, symbol)] = [names[target]]
+        final_states = {name for state, name in enumerate(names) if self.is_accepting(state)}
+        return FiniteAutomaton(set(names), set(self.symbols), transitions, names[self.start], final_states)
+
+    def close(self):
+        if isinstance(self.table, memoryview):
+            self.table.release()
+        self.accepting.release()
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LazyDFA:
+    """Runs an NFA through DFA states that are built only when input reaches them.
+
+    DFA states are NFA state bitmasks; each cached state remembers the
+    transitions computed from it so far. At most max_states states are kept,
+    the least recently used one is evicted when the cache is full, so memory
+    stays bounded even when the full subset construction would blow up.
+    stats counts transition cache hits and misses, evicted states, and
+    flushes (full clears through flush()).
+    """
+
+    def __init__(self, automaton, max_states=10000):
+        if max_states < 1:
+            raise ValueError("max_states must be at least 1")
+        numbering, self.successors, self.final_mask = automaton._successor_masks()
+        self.start_mask = 1 << numbering[automaton.start_state]
+        self.max_states = max_states
+        self.cache = OrderedDict()  # mask -> {symbol: next mask}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "flushes": 0}
+
+    def accepts(self, input_string):
+        stats = self.stats
+        mask = self.start_mask
+        for symbol in input_string:
+            moves = self._moves(mask)
+            next_mask = moves.get(symbol)
+            if next_mask is None:
+                stats["misses"] += 1
+                next_mask = self._step(mask, symbol)
+                moves[symbol] = next_mask
+            else:
+                stats["hits"] += 1
+
+            if not next_mask:
+                return False
+            mask = next_mask
+        return bool(mask & self.final_mask)
+
+    def accepts_many(self, strings):
+        return [self.accepts(s) for s in strings]
+
+    def is_final(self, mask):
+        return bool(mask & self.final_mask)
+
+    def transition(self, mask, symbol):
+        """DFA state reached from mask on symbol, going through the cache."""
+        moves = self._moves(mask)
+        next_mask = moves.get(symbol)
+        if next_mask is None:
+            self.stats["misses"] += 1
+            next_mask = moves[symbol] = self._step(mask, symbol)
+        else:
+            self.stats["hits"] += 1
+        return next_mask
+
+    def flush(self):
+        """Drop every cached DFA state."""
+        self.cache.clear()
+        self.stats["flushes"] += 1
+
+    def _moves(self, mask):
+        """Cached transitions of mask, marking it as the most recently used."""
+        moves = self.cache.get(mask)
+        if moves is None:
+            return self._add_state(mask)
+        self.cache.move_to_end(mask)
+        return moves
+
+    def _add_state(self, mask):
+        if len(self.cache) >= self.max_states:
+            self.cache.popitem(last=False)
+            self.stats["evictions"] += 1
+        moves = {}
+        self.cache[mask] = moves
+        return moves
+
+    def _step(self, mask, symbol):
+        row = self.successors.get(symbol)
+        if row is None:
+            return 0
+        next_mask = 0
+        while mask:
+            low = mask & -mask
+            next_mask |= row[low.bit_length() - 1]
+            mask ^= low
+        return next_mask
+
+
+class BitParallelNFA:
+    """Simulates an NFA on a bit vector of active states, without determinizing.
+
+    The state vector is cut into bytes, and for every (symbol, byte position,
+    byte value) the union of successors is precomputed. One input symbol then
+    costs one table lookup per non-zero byte of the vector, however many
+    states are active. accepts_many runs the same tables on NumPy uint64
+    arrays over batches of equal-length inputs when NumPy is installed.
+    """
+
+    def __init__(self, automaton):
+        numbering, successors, self.final_mask = automaton._successor_masks()
+        self.start_mask = 1 << numbering[automaton.start_state]
+        self.chunks = (len(numbering) + 7) // 8
+        self.tables = {symbol: self._byte_tables(row) for symbol, row in successors.items()}
+        self._np_tables = None
+
+    def _byte_tables(self, row):
+        tables = []
+        for chunk in range(self.chunks):
+            base = chunk * 8
+            table = [0] * 256
+            for bit in range(8):
+                if base + bit < len(row):
+                    step = 1 << bit
+                    successors = row[base + bit]
+                    # Every value with this bit set gets the state's successors
+                    for value in range(step, 256, 2 * step):
+                        for v in range(value, value + step):
+                            table[v] |= successors
+            tables.append(table)
+        return tables
+
+    def accepts(self, input_string):
+        mask = self.start_mask
+        for symbol in input_string:
+            tables = self.tables.get(symbol)
+            if tables is None:
+                return False
+            next_mask = 0
+            chunk = 0
+            while mask:
+                value = mask & 0xFF
+                if value:
+                    next_mask |= tables[chunk][value]
+                mask >>= 8
+                chunk += 1
+            if not next_mask:
+                return False
+            mask = next_mask
+        return bool(mask & self.final_mask)
+
+    def accepts_many(self, strings, vectorize=True):
+        strings = list(strings)
+        if not vectorize or np is None:
+            return [self.accepts(s) for s in strings]
+
+        results = [False] * len(strings)
+        by_length = {}
+        for i, s in enumerate(strings):
+            by_length.setdefault(len(s), []).append(i)
+
+        tables, columns = self._numpy_tables()
+        words = tables.shape[-1]
+        start = self._to_words(self.start_mask, words)
+        final = self._to_words(self.final_mask, words)
+        unknown = len(columns)
+
+        for length, indices in by_length.items():
+            state = np.repeat(start[None, :], len(indices), axis=0)
+            symbols = np.array([[columns.get(symbol, unknown) for symbol in strings[i]] for i in indices],
+                               dtype=np.intp).reshape(len(indices), length)
+            for step in range(length):
+                column = symbols[:, step]
+                next_state = np.zeros_like(state)
+                for chunk in range(self.chunks):
+                    value = (state[:, chunk // 8] >> np.uint64(8 * (chunk % 8))) & np.uint64(0xFF)
+                    next_state |= tables[column, chunk, value.astype(np.intp)]
+                state = next_state
+            accepted = (state & final).any(axis=1)
+            for i, value in zip(indices, accepted.tolist()):
+                results[i] = value
+        return results
+
+    def _numpy_tables(self):
+        """Tables as a (symbol, chunk, byte value, word) uint64 array.
+
+        The last symbol row is all zeros and stands for symbols outside the
+        alphabet, which empty the state set.
+        """
+        if self._np_tables is None:
+            symbols = sorted(self.tables)
+            words = (self.chunks + 7) // 8
+            tables = np.zeros((len(symbols) + 1, self.chunks, 256, words), dtype=np.uint64)
+            for s, symbol in enumerate(symbols):
+                for chunk, table in enumerate(self.tables[symbol]):
+                    for value, mask in enumerate(table):
+                        if mask:
+                            tables[s, chunk, value] = self._to_words(mask, words)
+            self._np_tables = tables, {symbol: s for s, symbol in enumerate(symbols)}
+        return self._np_tables
+
+    @staticmethod
+    def _to_words(mask, words):
+        return np.array([(mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(words)], dtype=np.uint64)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Variant 15 finite automaton")
+    parser.add_argument("--dot", metavar="FILE", help="write the FA as a Graphviz DOT file")
+    parser.add_argument("--svg", metavar="FILE", help="write the FA as an SVG image")
+    parser.add_argument("--no-plot", action="store_true", help="skip the matplotlib window")
+    args = parser.parse_args(argv)
+
+    # Variant 15 Definition
+    states = {'q0', 'q1', 'q2', 'q3'}
+    alphabet = {'a', 'b', 'c'}
+    transitions = {
+        ('q0', 'a'): ['q0', 'q1'],
+        ('q1', 'b'): ['q2'],
+        ('q2', 'a'): ['q2'],
+        ('q2', 'b'): ['q3'],
+        ('q2', 'c'): ['q0']
+    }
+    start_state = 'q0'
+    final_states = {'q3'}
+
+    # Instantiate FA
+    fa = FiniteAutomaton(states, alphabet, transitions, start_state, final_states)
+
+    # Check if DFA
+    is_dfa = fa.is_deterministic()
+    print(f"Is the FA deterministic? {'Yes' if is_dfa else 'No'}")
+
+    # Convert to Regular Grammar
+    regular_grammar = fa.to_regular_grammar()
+    print("\nRegular Grammar Production Rules:")
+    for production in regular_grammar.productions:
+        print(production)
+
+    # Grammar classification
+    grammar_type = fa.classify_grammar()
+    print(f"\nGrammar Type: {grammar_type}")
+
+    # Convert NDFA to DFA if necessary
+    if not is_dfa:
+        dfa = fa.convert_ndfa_to_dfa()
+        print("\nConverted DFA Transitions:")
+        for (state_set, symbol), (next_state_set,) in dfa.transitions.items():
+            current = ','.join(sorted(state_set))
+            next_state = ','.join(sorted(next_state_set))
+            print(f"({current}, {symbol}) -> {next_state}")
+
+        minimal_dfa = dfa.minimize()
+        print(f"\nMinimized DFA: {len(dfa.states)} -> {len(minimal_dfa.states)} states")
+        for (state, symbol), (next_state,) in sorted(minimal_dfa.transitions.items()):
+            print(f"({state}, {symbol}) -> {next_state}")
+
+    # Export or visualize the FA
+    if args.dot:
+        fa.write_dot(args.dot)
+    if args.svg:
+        fa.write_svg(args.svg)
+    if not args.no_plot:
+        fa.visualize()
+
+
+if __name__ == "__main__":
+    main()
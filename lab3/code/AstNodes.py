@@ -0,0 +1,135 @@
+# AstNodes.py
+from TokenType import TokenType
+
+class Node:
+    # Base of the syntax tree nodes built by Parser. Every node remembers the
+    # line of the token it starts at, for error messages.
+    __slots__ = ('line',)
+    fields = ()
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields)
+        return f"{type(self).__name__}({values})"
+
+
+class Program(Node):
+    __slots__ = fields = ('statements',)
+
+    def __init__(self, statements, line=1):
+        self.statements = statements
+        self.line = line
+
+
+class Declaration(Node):
+    # INT / DOUBLE / IMG / BATCH $name = value;
+    __slots__ = fields = ('type', 'name', 'value')
+
+    def __init__(self, declared_type: TokenType, name, value, line):
+        self.type = declared_type
+        self.name = name
+        self.value = value
+        self.line = line
+
+
+class Assignment(Node):
+    __slots__ = fields = ('name', 'value')
+
+    def __init__(self, name, value, line):
+        self.name = name
+        self.value = value
+        self.line = line
+
+
+class Foreach(Node):
+    # FOREACH IMG $variable IN #batch { body }
+    __slots__ = fields = ('variable', 'batch', 'body')
+
+    def __init__(self, variable, batch, body, line):
+        self.variable = variable
+        self.batch = batch
+        self.body = body
+        self.line = line
+
+
+class If(Node):
+    # branches: (condition, body) for the IF and every ELIF, else_body may be empty
+    __slots__ = fields = ('branches', 'else_body')
+
+    def __init__(self, branches, else_body, line):
+        self.branches = branches
+        self.else_body = else_body
+        self.line = line
+
+
+class Crop(Node):
+    __slots__ = fields = ('name', 'width', 'height')
+
+    def __init__(self, name, width, height, line):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.line = line
+
+
+class Rotate(Node):
+    # direction is TokenType.LEFT or TokenType.RIGHT
+    __slots__ = fields = ('name', 'direction')
+
+    def __init__(self, name, direction: TokenType, line):
+        self.name = name
+        self.direction = direction
+        self.line = line
+
+
+class SetFilter(Node):
+    # SET $img NEGATIVE / SEPIA / BW / SHARPEN;
+    __slots__ = fields = ('name', 'filter')
+
+    def __init__(self, name, image_filter: TokenType, line):
+        self.name = name
+        self.filter = image_filter
+        self.line = line
+
+
+class Literal(Node):
+    __slots__ = fields = ('value',)
+
+    def __init__(self, value, line):
+        self.value = value
+        self.line = line
+
+
+class Variable(Node):
+    __slots__ = fields = ('name',)
+
+    def __init__(self, name, line):
+        self.name = name
+        self.line = line
+
+
+class Metadata(Node):
+    # METADATA $img FWIDTH / FHEIGHT / FSIZE / FNAME
+    __slots__ = fields = ('name', 'field')
+
+    def __init__(self, name, field: TokenType, line):
+        self.name = name
+        self.field = field
+        self.line = line
+
+
+class BinaryOp(Node):
+    __slots__ = fields = ('operator', 'left', 'right')
+
+    def __init__(self, operator: TokenType, left, right, line):
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.line = line
+
+
+class Negate(Node):
+    __slots__ = fields = ('operand',)
+
+    def __init__(self, operand, line):
+        self.operand = operand
+        self.line = line
@@ -0,0 +1,113 @@
+# BatchTokenizer.py
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from TokenCache import TokenCache
+from Tokenizer import Tokenizer
+
+_worker_cache = None
+
+
+def _init_worker(cache_directory):
+    global _worker_cache
+    _worker_cache = TokenCache(cache_directory) if cache_directory else None
+
+
+def _tokenize_text(key, text):
+    # Runs in a worker: tokenizes one script, stores the cache entry and sends
+    # back the serialized entry, which is much smaller to pickle than tokens
+    try:
+        result = Tokenizer(text).tokenize_buffer()
+    except Exception as error:
+        result = error
+    data = TokenCache.serialize(result)
+    if _worker_cache is not None:
+        _worker_cache.store(key, data)
+    return data
+
+
+class BatchTokenizer:
+    # Tokenizes many scripts at once. Scripts whose text is already in the
+    # cache are loaded from it, the others are tokenized on a process pool
+    # and added to it.
+
+    def __init__(self, cache_directory=None, workers=None):
+        self.cache_directory = cache_directory
+        self.cache = TokenCache(cache_directory) if cache_directory else None
+        self.workers = workers or os.cpu_count() or 1
+
+    @staticmethod
+    def find_scripts(pattern):
+        # Every file under a directory, or the files matching a glob pattern
+        if os.path.isdir(pattern):
+            paths = [os.path.join(root, name) for root, _, names in os.walk(pattern) for name in names]
+        else:
+            paths = [path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)]
+        return sorted(paths)
+
+    def tokenize_files(self, paths):
+        # Returns (path, result) pairs in the order of paths, a result being the
+        # TokenBuffer of the script or the Exception it failed with
+        paths = list(paths)
+        results = [None] * len(paths)
+        pending = []
+        for i, path in enumerate(paths):
+            try:
+                with open(path, encoding='utf-8', newline='') as script:
+                    text = script.read()
+            except (OSError, UnicodeDecodeError) as error:
+                results[i] = error
+                continue
+            key = TokenCache.key(text)
+            cached = self.cache.load(text, key) if self.cache else None
+            if cached is None:
+                pending.append((i, key, text))
+            else:
+                results[i] = cached
+
+        if pending:
+            keys = [key for _, key, _ in pending]
+            texts = [text for _, _, text in pending]
+            if self.workers > 1 and len(pending) > 1:
+                chunk_size = max(1, len(pending) // (self.workers * 4))
+                with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                         initargs=(self.cache_directory,)) as pool:
+                    entries = list(pool.map(_tokenize_text, keys, texts, chunksize=chunk_size))
+            else:
+                _init_worker(self.cache_directory)
+                entries = list(map(_tokenize_text, keys, texts))
+            for (i, _, text), data in zip(pending, entries):
+                results[i] = TokenCache.deserialize(text, data)
+
+        return list(zip(paths, results))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tokenize many lab3 scripts")
+    parser.add_argument("pattern", help="directory or glob pattern of the scripts")
+    parser.add_argument("--cache", metavar="DIR", help="token cache directory")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    batch = BatchTokenizer(args.cache, args.workers)
+    results = batch.tokenize_files(batch.find_scripts(args.pattern))
+    tokens = 0
+    for path, result in results:
+        if isinstance(result, Exception):
+            print(f"{path}: {result}", file=sys.stderr)
+        else:
+            tokens += len(result)
+    failed = sum(isinstance(result, Exception) for _, result in results)
+    elapsed = time.perf_counter() - started
+    cached = batch.cache.hits if batch.cache else 0
+    print(f"Tokenized {len(results)} files ({cached} from cache, {failed} failed), "
+          f"{tokens} tokens in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# ImageFile.py
+import os
+from ImageMetadata import ImageMetadata
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only pixel operations need it
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, without it only PPM/PGM files can be read and written
+    Image = None
+
+class ImageFile:
+    # An image of the DSL: the file it comes from and the operations applied to
+    # it. Operations are only recorded; the pixels are read and transformed
+    # when the image is saved, so a dry run never decodes an image.
+
+    netpbm_extensions = ('.ppm', '.pgm', '.pnm')
+
+    def __init__(self, path, stat_size=None, header_size=None):
+        # stat_size and header_size can come from an ImageMetadata index
+        self.path = path
+        self.operations = []
+        self.stat_size = stat_size
+        self.header_size = header_size
+
+    def __repr__(self):
+        return f"ImageFile({self.path!r}, {len(self.operations)} operations)"
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def file_size(self):
+        if self.stat_size is None:
+            self.stat_size = os.path.getsize(self.path)
+        return self.stat_size
+
+    def size(self):
+        # (width, height) of the file on disk, read from its header
+        if self.header_size is None:
+            self.header_size = ImageMetadata.read_size(self.path)
+        return self.header_size
+
+    # Recorded operations, each a tuple (name, arguments...)
+    def crop(self, width, height):
+        if width <= 0 or height <= 0:
+            raise Exception(f"Cannot crop {self.name} to {width}x{height}")
+        self.operations.append(('CROP', width, height))
+
+    def rotate(self, direction):
+        self.operations.append(('ROTATE', direction))
+
+    def apply_filter(self, image_filter):
+        self.operations.append(('SET', image_filter))
+
+    @staticmethod
+    def describe(operation):
+        if operation[0] == 'CROP':
+            return f"CROP {operation[1]}x{operation[2]}"
+        return " ".join(operation)
+
+    @staticmethod
+    def require(module, name, action):
+        if module is None:
+            raise Exception(f"{name} is needed to {action}")
+
+    def render(self):
+        # Reads the pixels as an RGB uint8 array and applies the operations
+        self.require(np, "numpy", "process images")
+        pixels = self.read_pixels()
+        for operation in self.operations:
+            pixels = getattr(self, 'render_' + operation[0].lower())(pixels, *operation[1:])
+        return pixels
+
+    def save(self, path):
+        pixels = self.render()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.lower().endswith(self.netpbm_extensions):
+            self.write_netpbm(path, pixels)
+        else:
+            self.require(Image, "Pillow", "write this image format")
+            Image.fromarray(pixels).save(path)
+
+    @staticmethod
+    def render_crop(pixels, width, height):
+        return pixels[:height, :width]
+
+    @staticmethod
+    def render_rotate(pixels, direction):
+        return np.ascontiguousarray(np.rot90(pixels, 1 if direction == 'LEFT' else -1))
+
+    @staticmethod
+    def render_set(pixels, image_filter):
+        if image_filter == 'NEGATIVE':
+            return 255 - pixels
+        values = pixels.astype(np.float32)
+        if image_filter == 'BW':
+            gray = values @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+            values = np.repeat(gray[:, :, None], 3, axis=2)
+        elif image_filter == 'SEPIA':
+            values = values @ np.array([[0.393, 0.349, 0.272],
+                                        [0.769, 0.686, 0.534],
+                                        [0.189, 0.168, 0.131]], dtype=np.float32)
+        elif image_filter == 'SHARPEN':
+            # 3x3 kernel [[0, -1, 0], [-1, 5, -1], [0, -1, 0]] with edges repeated
+            padded = np.pad(values, ((1, 1), (1, 1), (0, 0)), mode='edge')
+            values = (5 * values - padded[:-2, 1:-1] - padded[2:, 1:-1]
+                      - padded[1:-1, :-2] - padded[1:-1, 2:])
+        return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+    def read_pixels(self):
+        if self.path.lower().endswith(self.netpbm_extensions):
+            with open(self.path, 'rb') as image:
+                magic, width, height, _ = ImageMetadata.read_netpbm_header(image)
+                channels = 3 if magic == b'P6' else 1
+                data = image.read(width * height * channels)
+            pixels = np.frombuffer(data, dtype=np.uint8).reshape(height, width, channels)
+            return np.repeat(pixels, 3, axis=2) if channels == 1 else pixels.copy()
+        self.require(Image, "Pillow", "read this image format")
+        with Image.open(self.path) as image:
+            return np.asarray(image.convert('RGB')).copy()
+
+    @staticmethod
+    def write_netpbm(path, pixels):
+        height, width = pixels.shape[:2]
+        with open(path, 'wb') as image:
+            if path.lower().endswith('.pgm'):
+                image.write(b'P5\n%d %d\n255\n' % (width, height))
+                image.write(np.ascontiguousarray(pixels[:, :, 0]).tobytes())
+            else:
+                image.write(b'P6\n%d %d\n255\n' % (width, height))
+                image.write(np.ascontiguousarray(pixels).tobytes())
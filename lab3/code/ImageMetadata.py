@@ -0,0 +1,196 @@
+# ImageMetadata.py
+import json
+import os
+import struct
+import tempfile
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, it only reads the formats not parsed below
+    Image = None
+
+class ImageMetadata:
+    # Width and height of image files read from their headers only, and a
+    # persistent index of them per batch directory. The index is a JSON file
+    # in the directory mapping every image name to [mtime_ns, size, width,
+    # height]; an entry is reused while the file's mtime and size match, so
+    # a repeated run only stats the directory.
+
+    index_name = '.lab3-metadata.json'
+    index_version = 1
+    extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.webp', '.ppm', '.pgm')
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.entries = {}
+        self.changed = False
+        self.headers_read = 0
+
+    @classmethod
+    def open(cls, directory):
+        # Index of a batch directory, brought up to date and saved
+        index = cls(directory)
+        index.load()
+        index.refresh()
+        if index.changed:
+            index.save()
+        return index
+
+    def load(self):
+        try:
+            with open(os.path.join(self.directory, self.index_name), encoding='utf-8') as index:
+                data = json.load(index)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == self.index_version:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        # Written atomically; a read-only batch directory just keeps no index
+        try:
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as index:
+                json.dump({'version': self.index_version, 'entries': self.entries}, index, separators=(',', ':'))
+            os.replace(temporary, os.path.join(self.directory, self.index_name))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self.changed = False
+
+    def refresh(self):
+        # Stats every image of the directory and reads the headers of new or
+        # modified files only
+        entries = {}
+        with os.scandir(self.directory) as files:
+            for file in files:
+                if not file.name.lower().endswith(self.extensions) or not file.is_file():
+                    continue
+                stat = file.stat()
+                entry = self.entries.get(file.name)
+                if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                    try:
+                        width, height = self.read_size(file.path)
+                    except Exception:
+                        width = height = None
+                    entry = [stat.st_mtime_ns, stat.st_size, width, height]
+                    self.headers_read += 1
+                    self.changed = True
+                entries[file.name] = entry
+        if entries.keys() != self.entries.keys():
+            self.changed = True
+        self.entries = entries
+
+    def images(self):
+        # (path, file size, (width, height) or None) of every image, sorted by name
+        return [(os.path.join(self.directory, name), entry[1], None if entry[2] is None else (entry[2], entry[3]))
+                for name, entry in sorted(self.entries.items())]
+
+    @classmethod
+    def read_size(cls, path):
+        # (width, height) from the file header, without decoding pixels
+        with open(path, 'rb') as image:
+            head = image.read(32)
+            if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head.startswith(b'\xff\xd8'):
+                return cls.read_jpeg_size(image)
+            if head.startswith(b'BM'):
+                if struct.unpack('<I', head[14:18])[0] == 12:
+                    return struct.unpack('<HH', head[18:22])
+                width, height = struct.unpack('<ii', head[18:26])
+                return width, abs(height)
+            if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+                return cls.read_webp_size(head)
+            if head[:4] in (b'II*\x00', b'MM\x00*'):
+                return cls.read_tiff_size(image)
+            if head[:2] in (b'P5', b'P6'):
+                image.seek(0)
+                _, width, height, _ = cls.read_netpbm_header(image)
+                return width, height
+        if Image is not None:
+            with Image.open(path) as image:
+                return image.size
+        raise Exception(f"Cannot read the size of {path}: unknown image format")
+
+    @staticmethod
+    def read_jpeg_size(image):
+        # Walks the marker segments up to the first start-of-frame (SOFn)
+        image.seek(2)
+        while True:
+            byte = image.read(1)
+            while byte and byte != b'\xff':
+                byte = image.read(1)
+            while byte == b'\xff':
+                byte = image.read(1)
+            if not byte:
+                break
+            marker = byte[0]
+            if marker == 0x01 or 0xd0 <= marker <= 0xd9:
+                continue
+            length = image.read(2)
+            if len(length) < 2:
+                break
+            length = struct.unpack('>H', length)[0]
+            if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+                height, width = struct.unpack('>xHH', image.read(5))
+                return width, height
+            image.seek(length - 2, os.SEEK_CUR)
+        raise Exception(f"No JPEG frame header in {image.name}")
+
+    @staticmethod
+    def read_webp_size(head):
+        chunk = head[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', head[26:30])
+            return width & 0x3fff, height & 0x3fff
+        if chunk == b'VP8L':
+            bits = struct.unpack('<I', head[21:25])[0]
+            return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+        if chunk == b'VP8X':
+            return (int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1)
+        raise Exception("Unknown WebP chunk")
+
+    @staticmethod
+    def read_tiff_size(image):
+        # ImageWidth (256) and ImageLength (257) of the first IFD
+        image.seek(0)
+        order = '<' if image.read(2) == b'II' else '>'
+        image.seek(4)
+        offset = struct.unpack(order + 'I', image.read(4))[0]
+        image.seek(offset)
+        count = struct.unpack(order + 'H', image.read(2))[0]
+        size = {}
+        for _ in range(count):
+            tag, field_type, _, value = struct.unpack(order + 'HHI4s', image.read(12))
+            if tag in (256, 257):
+                size[tag] = struct.unpack(order + ('H' if field_type == 3 else 'I'), value[:2 if field_type == 3 else 4])[0]
+        if len(size) < 2:
+            raise Exception(f"No image size in {image.name}")
+        return size[256], size[257]
+
+    @staticmethod
+    def read_netpbm_header(image):
+        # Binary PPM (P6) / PGM (P5) header: magic, width, height, maxval
+        fields = []
+        while len(fields) < 4:
+            field = b''
+            while True:
+                char = image.read(1)
+                if char == b'#' and not field:
+                    image.readline()
+                    continue
+                if not char or char.isspace():
+                    break
+                field += char
+            if not char and not field:
+                raise Exception(f"Truncated image header in {getattr(image, 'name', 'image')}")
+            if field:
+                fields.append(field)
+        if fields[0] not in (b'P5', b'P6') or int(fields[3]) > 255:
+            raise Exception(f"Unsupported image format in {getattr(image, 'name', 'image')}")
+        return fields[0], int(fields[1]), int(fields[2]), int(fields[3])
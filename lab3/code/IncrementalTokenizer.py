@@ -0,0 +1,174 @@
+# IncrementalTokenizer.py
+import re
+from Token import Token
+from TokenType import TokenType
+from Tokenizer import Tokenizer
+
+class TokenDelta:
+    # Result of IncrementalTokenizer.edit: rows first_row .. first_row + old_rows - 1
+    # (physical lines, 0-based) were replaced by new_rows lines, `removed` are the
+    # tokens that started on the old rows and `inserted` the ones that start on the
+    # new rows. Tokens after them kept their columns, their line moved by line_shift.
+    def __init__(self, first_row, old_rows, new_rows, removed, inserted, line_shift):
+        self.first_row = first_row
+        self.old_rows = old_rows
+        self.new_rows = new_rows
+        self.removed = removed
+        self.inserted = inserted
+        self.line_shift = line_shift
+
+    def __repr__(self):
+        return (f"TokenDelta(rows {self.first_row}+{self.old_rows} -> {self.new_rows}, "
+                f"-{len(self.removed)} +{len(self.inserted)} tokens, line shift {self.line_shift})")
+
+
+class IncrementalTokenizer:
+    # Keeps a script split into physical lines together with the tokens that start
+    # on each line and the lexer state at each line start: the Tokenizer line
+    # number there, or None when the line starts inside a multi-line string.
+    # An edit re-lexes from the last clean line before it and stops at the first
+    # clean line after it whose old state was clean too; from there on the old
+    # tokens are reused.
+
+    line_regex = re.compile(r'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+')
+
+    def __init__(self, input_text: str):
+        self.lines = self.split_lines(input_text)
+        self.line_tokens = []
+        self.line_states = []
+        tokens, states, self.eof = self.lex_lines(self.lines, 1)
+        self.line_tokens = tokens
+        self.line_states = states
+
+    @classmethod
+    def split_lines(cls, text):
+        return cls.line_regex.findall(text)
+
+    def text(self):
+        return "".join(self.lines)
+
+    def tokens(self):
+        tokens = [token for line in self.line_tokens for token in line]
+        tokens.append(self.eof)
+        return tokens
+
+    def lex_lines(self, lines, line_number):
+        # Tokenizes lines starting from a clean line whose Tokenizer line is line_number.
+        # Returns the tokens starting on each line, each line's start state and the
+        # EOF token that would follow the last line.
+        text = "".join(lines)
+        starts = [0]
+        for line in lines:
+            starts.append(starts[-1] + len(line))
+
+        tokenizer = Tokenizer(text)
+        tokenizer.line = line_number
+        tokens = [[] for _ in lines]
+        states = [None] * len(lines)
+        length = len(text)
+        row = 0
+
+        while tokenizer.position < length:
+            # Every line start reached outside a token is clean
+            while starts[row + 1] <= tokenizer.position:
+                row += 1
+            if starts[row] == tokenizer.position and states[row] is None:
+                states[row] = tokenizer.line
+
+            current = text[tokenizer.position]
+            if current in ('\n', '\r'):
+                tokenizer.handle_newline(current)
+                continue
+            if current in (' ', '\t'):
+                tokenizer.skip_whitespace()
+                continue
+
+            token = tokenizer.match_token()
+            if not token:
+                raise Exception(f"Unexpected character '{current}' at line {tokenizer.line}, column {tokenizer.column}")
+            tokens[row].append(token)
+
+        return tokens, states, Token(TokenType.EOF, "", tokenizer.line, tokenizer.column)
+
+    def edit(self, start_row, start_col, end_row, end_col, replacement):
+        # Replaces the text between (start_row, start_col) and (end_row, end_col),
+        # 0-based physical line and column, and re-lexes as little as possible
+        if end_row == len(self.lines):
+            if self.lines and not self.lines[-1].endswith(('\n', '\r')):
+                raise IndexError(f"row {end_row} is past the end of the script")
+            # Editing after the last line break, add the empty last line. Its state
+            # is left unknown, which only means it is never used to resynchronize.
+            self.lines.append("")
+            self.line_tokens.append([])
+            self.line_states.append(None)
+
+        # Columns past the end of a line mean its end, before the line break
+        start_col = min(start_col, len(self.lines[start_row].rstrip('\r\n')))
+        end_col = min(end_col, len(self.lines[end_row].rstrip('\r\n')))
+
+        # Take in a neighbouring line when a '\r' + '\n' pair may form or break at the edges
+        first_row = start_row - 1 if start_row > 0 and self.lines[start_row - 1].endswith('\r') else start_row
+        segment = ("".join(self.lines[first_row:start_row]) + self.lines[start_row][:start_col] + replacement
+                   + self.lines[end_row][end_col:])
+        last_row = end_row
+        if segment.endswith('\r') and last_row + 1 < len(self.lines):
+            last_row += 1
+            segment += self.lines[last_row]
+        new_lines = self.split_lines(segment)
+        old_rows = last_row - first_row + 1
+        edited_end = first_row + len(new_lines)  # first row after the new text
+        row_shift = len(new_lines) - old_rows
+
+        # Restart from the last clean line at or before the edit
+        restart = first_row
+        while restart > 0 and self.line_states[restart] is None:
+            restart -= 1
+        line_number = self.line_states[restart] if self.line_states else 1
+        if line_number is None:
+            line_number = 1
+
+        lines = self.lines
+        old_lines = lines[first_row:last_row + 1]
+        lines[first_row:last_row + 1] = new_lines
+        window = edited_end - restart + 1
+        try:
+            while True:
+                stop = min(restart + window, len(lines))
+                tokens, states, eof = self.lex_lines(lines[restart:stop], line_number)
+                resync = None
+                for row in range(max(edited_end, restart + 1), stop):
+                    old_row = row - row_shift
+                    if states[row - restart] is not None and self.line_states[old_row] is not None:
+                        resync = row
+                        break
+                if resync is not None or stop == len(lines):
+                    break
+                window *= 2
+        except Exception:
+            lines[first_row:edited_end] = old_lines
+            raise
+
+        if resync is None:
+            resync = len(lines)
+            line_shift = 0
+        else:
+            line_shift = states[resync - restart] - self.line_states[resync - row_shift]
+
+        old_end = resync - row_shift
+        removed = [token for line in self.line_tokens[restart:old_end] for token in line]
+        inserted = [token for line in tokens[:resync - restart] for token in line]
+
+        if line_shift:
+            for line in self.line_tokens[old_end:]:
+                for token in line:
+                    token.line += line_shift
+            self.line_states[old_end:] = [None if state is None else state + line_shift
+                                          for state in self.line_states[old_end:]]
+
+        self.line_tokens[restart:old_end] = tokens[:resync - restart]
+        self.line_states[restart:old_end] = states[:resync - restart]
+        if resync == len(lines):
+            self.eof = eof
+        else:
+            self.eof.line += line_shift
+        return TokenDelta(restart, old_end - restart, resync - restart, removed, inserted, line_shift)
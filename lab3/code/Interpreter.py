@@ -0,0 +1,240 @@
+# Interpreter.py
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from AstNodes import (Assignment, BinaryOp, Crop, Declaration, Foreach, If, Literal, Metadata, Negate,
+                      Rotate, SetFilter, Variable)
+from ImageFile import ImageFile
+from ImageMetadata import ImageMetadata
+from Parser import Parser
+from Tokenizer import Tokenizer
+from TokenType import TokenType
+
+_worker_interpreter = None
+_worker_loop = None
+_worker_variables = None
+
+
+def _init_worker(output_directory, loop, variables):
+    global _worker_interpreter, _worker_loop, _worker_variables
+    _worker_interpreter = Interpreter(output_directory, workers=1)
+    _worker_loop = loop
+    _worker_variables = variables
+
+
+def _run_iteration(path, stat_size, header_size):
+    return _worker_interpreter.run_iteration(_worker_loop, _worker_variables, ImageFile(path, stat_size, header_size))
+
+
+class Interpreter:
+    # Runs a parsed script. Image operations are recorded on ImageFile objects
+    # and an image is written to output_directory (under its own name) at the
+    # end of the FOREACH iteration or program it belongs to; without an
+    # output directory nothing is written (dry run). Every processed image
+    # gets one line in the log.
+    #
+    # The iterations of a FOREACH run on a pool of worker processes, with at
+    # most max_in_flight images submitted at a time; their log lines are
+    # written in batch order as soon as every earlier image is done. Each
+    # iteration works on its own copy of the variables, so assignments made
+    # inside a FOREACH body are not seen after the loop.
+
+    def __init__(self, output_directory=None, workers=None, max_in_flight=None, log=None):
+        self.output_directory = output_directory
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 4 * self.workers
+        self.log = log
+        self.variables = {}
+
+    @classmethod
+    def run_source(cls, text, **options):
+        interpreter = cls(**options)
+        interpreter.run(Parser(Tokenizer(text).tokenize()).parse())
+        return interpreter
+
+    def run(self, program):
+        images = []
+        self.execute_block(program.statements, self.variables, images)
+        self.write(self.finish_images(images))
+
+    def write(self, lines):
+        if self.log is not None:
+            for line in lines:
+                self.log.write(line + "\n")
+
+    def run_iteration(self, loop, variables, image):
+        # One FOREACH iteration: returns the log lines of its images
+        variables = dict(variables)
+        variables[loop.variable] = image
+        images = [image]
+        self.execute_block(loop.body, variables, images)
+        return self.finish_images(images)
+
+    def finish_images(self, images):
+        lines = []
+        for image in images:
+            operations = "; ".join(map(ImageFile.describe, image.operations)) or "unchanged"
+            if image.operations and self.output_directory is not None:
+                target = os.path.join(self.output_directory, image.name)
+                image.save(target)
+                lines.append(f"{image.name}: {operations} -> {target}")
+            else:
+                lines.append(f"{image.name}: {operations}")
+        return lines
+
+    def execute_block(self, statements, variables, images):
+        for statement in statements:
+            self.execute(statement, variables, images)
+
+    def execute(self, statement, variables, images):
+        if isinstance(statement, Declaration):
+            value = self.convert(statement.type, self.evaluate(statement.value, variables), statement.line)
+            if isinstance(value, ImageFile) and value not in images:
+                images.append(value)
+            variables[statement.name] = value
+        elif isinstance(statement, Assignment):
+            old = self.lookup(statement.name, variables, statement.line)
+            value = self.evaluate(statement.value, variables)
+            if isinstance(old, bool) or not isinstance(old, (int, float)):
+                variables[statement.name] = value
+            else:
+                declared = TokenType.INT if isinstance(old, int) else TokenType.DOUBLE
+                variables[statement.name] = self.convert(declared, value, statement.line)
+        elif isinstance(statement, Foreach):
+            self.run_foreach(statement, variables)
+        elif isinstance(statement, If):
+            for condition, body in statement.branches:
+                if self.evaluate(condition, variables):
+                    self.execute_block(body, variables, images)
+                    break
+            else:
+                self.execute_block(statement.else_body, variables, images)
+        elif isinstance(statement, Crop):
+            image = self.image(statement.name, variables, statement.line)
+            width = self.convert(TokenType.INT, self.evaluate(statement.width, variables), statement.line)
+            height = self.convert(TokenType.INT, self.evaluate(statement.height, variables), statement.line)
+            image.crop(width, height)
+        elif isinstance(statement, Rotate):
+            self.image(statement.name, variables, statement.line).rotate(statement.direction.name)
+        elif isinstance(statement, SetFilter):
+            self.image(statement.name, variables, statement.line).apply_filter(statement.filter.name)
+        else:
+            raise Exception(f"Cannot execute {statement!r}")
+
+    def run_foreach(self, loop, variables):
+        directory = self.lookup(loop.batch, variables, loop.line)
+        if not isinstance(directory, str) or not os.path.isdir(directory):
+            raise Exception(f"{loop.batch} is not a batch directory at line {loop.line}")
+        # Sizes come from the directory's metadata index, so METADATA needs
+        # no file access for images seen by an earlier run
+        images = ImageMetadata.open(directory).images()
+
+        if self.workers <= 1 or len(images) <= 1:
+            for path, stat_size, header_size in images:
+                self.write(self.run_iteration(loop, variables, ImageFile(path, stat_size, header_size)))
+            return
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                 initargs=(self.output_directory, loop, variables)) as pool:
+            in_flight = deque()
+            try:
+                for path, stat_size, header_size in images:
+                    in_flight.append(pool.submit(_run_iteration, path, stat_size, header_size))
+                    if len(in_flight) >= self.max_in_flight:
+                        self.write(in_flight.popleft().result())
+                while in_flight:
+                    self.write(in_flight.popleft().result())
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+    def lookup(self, name, variables, line):
+        if name not in variables:
+            raise Exception(f"Undefined variable '{name}' at line {line}")
+        return variables[name]
+
+    def image(self, name, variables, line):
+        value = self.lookup(name, variables, line)
+        if not isinstance(value, ImageFile):
+            raise Exception(f"'{name}' is not an image at line {line}")
+        return value
+
+    def convert(self, declared_type, value, line):
+        try:
+            if declared_type == TokenType.INT:
+                return int(value)
+            if declared_type == TokenType.DOUBLE:
+                return float(value)
+        except (TypeError, ValueError):
+            raise Exception(f"Cannot use {value!r} as {declared_type.name} at line {line}") from None
+        if declared_type == TokenType.IMG:
+            if isinstance(value, ImageFile):
+                return value
+            if isinstance(value, str):
+                return ImageFile(value)
+            raise Exception(f"Cannot use {value!r} as IMG at line {line}")
+        if declared_type == TokenType.BATCH and not isinstance(value, str):
+            raise Exception(f"Cannot use {value!r} as BATCH at line {line}")
+        return value
+
+    def evaluate(self, expression, variables):
+        if isinstance(expression, Literal):
+            return expression.value
+        if isinstance(expression, Variable):
+            return self.lookup(expression.name, variables, expression.line)
+        if isinstance(expression, Metadata):
+            image = self.image(expression.name, variables, expression.line)
+            if expression.field == TokenType.FWIDTH:
+                return image.size()[0]
+            if expression.field == TokenType.FHEIGHT:
+                return image.size()[1]
+            if expression.field == TokenType.FSIZE:
+                return image.file_size()
+            return image.name
+        if isinstance(expression, Negate):
+            return -self.evaluate(expression.operand, variables)
+        if isinstance(expression, BinaryOp):
+            left = self.evaluate(expression.left, variables)
+            right = self.evaluate(expression.right, variables)
+            try:
+                return self.operators[expression.operator](left, right)
+            except ZeroDivisionError:
+                raise Exception(f"Division by zero at line {expression.line}") from None
+            except TypeError:
+                raise Exception(f"Cannot apply {expression.operator.name} to {left!r} and {right!r} "
+                                f"at line {expression.line}") from None
+        raise Exception(f"Cannot evaluate {expression!r}")
+
+    operators = {
+        TokenType.PLUS: lambda a, b: a + b,
+        TokenType.MINUS: lambda a, b: a - b,
+        TokenType.MULTIPLY: lambda a, b: a * b,
+        TokenType.DIVIDE: lambda a, b: a / b,
+        TokenType.EQUAL: lambda a, b: a == b,
+        TokenType.NOT_EQUAL: lambda a, b: a != b,
+        TokenType.SMALLER: lambda a, b: a < b,
+        TokenType.SMALLER_EQUAL: lambda a, b: a <= b,
+        TokenType.GREATER: lambda a, b: a > b,
+        TokenType.GREATER_EQUAL: lambda a, b: a >= b,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a lab3 image script")
+    parser.add_argument("script", help="script file")
+    parser.add_argument("--output", metavar="DIR", help="where processed images are written (default: dry run)")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--in-flight", type=int, help="images submitted at a time (default: 4 per worker)")
+    args = parser.parse_args(argv)
+
+    with open(args.script, encoding='utf-8') as script:
+        text = script.read()
+    Interpreter.run_source(text, output_directory=args.output, workers=args.workers,
+                           max_in_flight=args.in_flight, log=sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# Parser.py
+from AstNodes import (Assignment, BinaryOp, Crop, Declaration, Foreach, If, Literal, Metadata, Negate,
+                      Program, Rotate, SetFilter, Variable)
+from TokenType import TokenType
+
+class Parser:
+    # Recursive descent parser over the tokens of Tokenizer.tokenize():
+    #
+    #   program     := statement* EOF
+    #   statement   := (INT | DOUBLE | IMG | BATCH) VAR '=' expression ';'
+    #                | VAR '=' expression ';'
+    #                | FOREACH IMG VAR IN VAR block
+    #                | IF expression block (ELIF expression block)* (ELSE block)?
+    #                | CROP VAR '(' expression ',' expression ')' ';'
+    #                | ROTATE VAR (LEFT | RIGHT) ';'
+    #                | SET VAR (NEGATIVE | SEPIA | BW | SHARPEN) ';'
+    #   block       := '{' statement* '}'
+    #   expression  := sum (('==' | '!=' | '<' | '<=' | '>' | '>=') sum)?
+    #   sum         := product (('+' | '-') product)*
+    #   product     := unary (('*' | '/') unary)*
+    #   unary       := '-' unary | primary
+    #   primary     := number | string | VAR | METADATA VAR field | '(' expression ')'
+
+    declaration_types = (TokenType.INT, TokenType.DOUBLE, TokenType.IMG, TokenType.BATCH)
+    comparisons = (TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.SMALLER, TokenType.SMALLER_EQUAL,
+                   TokenType.GREATER, TokenType.GREATER_EQUAL)
+    filters = (TokenType.NEGATIVE, TokenType.SEPIA, TokenType.BW, TokenType.SHARPEN)
+    metadata_fields = (TokenType.FWIDTH, TokenType.FHEIGHT, TokenType.FSIZE, TokenType.FNAME)
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position]
+
+    def check(self, *token_types):
+        return self.tokens[self.position].type in token_types
+
+    def advance(self):
+        token = self.tokens[self.position]
+        if token.type != TokenType.EOF:
+            self.position += 1
+        return token
+
+    def expect(self, *token_types):
+        token = self.peek()
+        if token.type not in token_types:
+            expected = " or ".join(token_type.name for token_type in token_types)
+            raise Exception(f"Expected {expected} but found '{token.value}' at line {token.line}, column {token.column}")
+        return self.advance()
+
+    def parse(self):
+        statements = []
+        while not self.check(TokenType.EOF):
+            statements.append(self.statement())
+        return Program(statements)
+
+    def statement(self):
+        token = self.peek()
+        if token.type in self.declaration_types:
+            self.advance()
+            name = self.expect(TokenType.VAR_IDENTIFIER).value
+            self.expect(TokenType.ASSIGN)
+            value = self.expression()
+            self.expect(TokenType.EOL)
+            return Declaration(token.type, name, value, token.line)
+
+        if token.type == TokenType.VAR_IDENTIFIER:
+            self.advance()
+            self.expect(TokenType.ASSIGN)
+            value = self.expression()
+            self.expect(TokenType.EOL)
+            return Assignment(token.value, value, token.line)
+
+        if token.type == TokenType.FOREACH:
+            self.advance()
+            self.expect(TokenType.IMG)
+            variable = self.expect(TokenType.VAR_IDENTIFIER).value
+            self.expect(TokenType.IN)
+            batch = self.expect(TokenType.VAR_IDENTIFIER).value
+            return Foreach(variable, batch, self.block(), token.line)
+
+        if token.type == TokenType.IF:
+            self.advance()
+            branches = [(self.expression(), self.block())]
+            while self.check(TokenType.ELIF):
+                self.advance()
+                branches.append((self.expression(), self.block()))
+            else_body = []
+            if self.check(TokenType.ELSE):
+                self.advance()
+                else_body = self.block()
+            return If(branches, else_body, token.line)
+
+        if token.type == TokenType.CROP:
+            self.advance()
+            name = self.expect(TokenType.VAR_IDENTIFIER).value
+            self.expect(TokenType.OPEN_P)
+            width = self.expression()
+            self.expect(TokenType.COMMA)
+            height = self.expression()
+            self.expect(TokenType.CLOSE_P)
+            self.expect(TokenType.EOL)
+            return Crop(name, width, height, token.line)
+
+        if token.type == TokenType.ROTATE:
+            self.advance()
+            name = self.expect(TokenType.VAR_IDENTIFIER).value
+            direction = self.expect(TokenType.LEFT, TokenType.RIGHT).type
+            self.expect(TokenType.EOL)
+            return Rotate(name, direction, token.line)
+
+        if token.type == TokenType.SET:
+            self.advance()
+            name = self.expect(TokenType.VAR_IDENTIFIER).value
+            image_filter = self.expect(*self.filters).type
+            self.expect(TokenType.EOL)
+            return SetFilter(name, image_filter, token.line)
+
+        raise Exception(f"Unexpected '{token.value}' at line {token.line}, column {token.column}")
+
+    def block(self):
+        self.expect(TokenType.OPEN_BLOCK)
+        statements = []
+        while not self.check(TokenType.CLOSE_BLOCK):
+            if self.check(TokenType.EOF):
+                token = self.peek()
+                raise Exception(f"Missing '}}' at line {token.line}, column {token.column}")
+            statements.append(self.statement())
+        self.advance()
+        return statements
+
+    def expression(self):
+        left = self.sum()
+        if self.check(*self.comparisons):
+            operator = self.advance()
+            left = BinaryOp(operator.type, left, self.sum(), operator.line)
+        return left
+
+    def sum(self):
+        left = self.product()
+        while self.check(TokenType.PLUS, TokenType.MINUS):
+            operator = self.advance()
+            left = BinaryOp(operator.type, left, self.product(), operator.line)
+        return left
+
+    def product(self):
+        left = self.unary()
+        while self.check(TokenType.MULTIPLY, TokenType.DIVIDE):
+            operator = self.advance()
+            left = BinaryOp(operator.type, left, self.unary(), operator.line)
+        return left
+
+    def unary(self):
+        if self.check(TokenType.MINUS):
+            token = self.advance()
+            return Negate(self.unary(), token.line)
+        return self.primary()
+
+    def primary(self):
+        token = self.advance()
+        if token.type == TokenType.INT_VALUE:
+            return Literal(int(token.value), token.line)
+        if token.type == TokenType.DBL_VALUE:
+            return Literal(float(token.value), token.line)
+        if token.type == TokenType.PXLS_VALUE:
+            return Literal(int(token.value[:-1]), token.line)
+        if token.type == TokenType.STR_VALUE:
+            return Literal(token.value[1:-1], token.line)
+        if token.type == TokenType.VAR_IDENTIFIER:
+            return Variable(token.value, token.line)
+        if token.type == TokenType.METADATA:
+            name = self.expect(TokenType.VAR_IDENTIFIER).value
+            field = self.expect(*self.metadata_fields).type
+            return Metadata(name, field, token.line)
+        if token.type == TokenType.OPEN_P:
+            value = self.expression()
+            self.expect(TokenType.CLOSE_P)
+            return value
+        raise Exception(f"Expected a value but found '{token.value}' at line {token.line}, column {token.column}")
@@ -2,6 +2,8 @@
 from TokenType import TokenType
 
 class Token:
+    __slots__ = ('type', 'value', 'line', 'column')
+
     def __init__(self, token_type: TokenType, value: str, line: int, column: int):
         self.type = token_type
         self.value = value
@@ -0,0 +1,163 @@
+# TokenBuffer.py
+import struct
+import sys
+import zlib
+from array import array
+from TokenType import TokenType
+
+class TokenView:
+    # A token of a TokenBuffer, read from the buffer arrays when its fields are
+    # used. The value string is only cut out of the source on access.
+    __slots__ = ('buffer', 'index')
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def type(self):
+        return self.buffer.token_types[self.buffer.types[self.index]]
+
+    @property
+    def value(self):
+        return self.buffer.value(self.index)
+
+    @property
+    def line(self):
+        return self.buffer.lines[self.index]
+
+    @property
+    def column(self):
+        return self.buffer.columns[self.index]
+
+    def __repr__(self):
+        return f"{self.type}: '{self.value}' at line {self.line}, column {self.column}"
+
+
+class TokenBuffer:
+    # Tokens of one source text stored column-wise: a type id, start offset,
+    # length, line and column per token, each in its own compact array
+    # (8-bit type ids, 32-bit columns widened to 64 bits only when needed).
+    # Indexing gives TokenView objects, slicing and filter() give new buffers
+    # over the same source text.
+
+    token_types = list(TokenType)
+    type_ids = {token_type: i for i, token_type in enumerate(token_types)}
+    string_id = type_ids[TokenType.STR_VALUE]
+    column_names = ('types', 'starts', 'lengths', 'lines', 'columns')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.types = array('B')
+        self.starts = array('I')
+        self.lengths = array('I')
+        self.lines = array('I')
+        self.columns = array('I')
+
+    def append(self, token_type, start, length, line, column):
+        try:
+            self.starts.append(start)
+            self.lengths.append(length)
+            self.lines.append(line)
+            self.columns.append(column)
+        except OverflowError:
+            self.append_wide(start, length, line, column)
+        self.types.append(self.type_ids[token_type])
+
+    def append_wide(self, *values):
+        # Slow path of append(): the columns are 32-bit until a value does not
+        # fit, then that column is widened to 64 bits
+        for name, value in zip(self.column_names[1:], values):
+            column = getattr(self, name)
+            if len(column) > len(self.types):
+                continue
+            if column.typecode == 'I' and value >= 1 << 32:
+                column = array('q', column)
+                setattr(self, name, column)
+            column.append(value)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(index)
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError("token index out of range")
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield TokenView(self, index)
+
+    def take(self, selection):
+        # New buffer with the tokens of a slice or of a list of indices
+        result = TokenBuffer(self.source)
+        for name in self.column_names:
+            column = getattr(self, name)
+            if isinstance(selection, slice):
+                setattr(result, name, column[selection])
+            else:
+                setattr(result, name, array(column.typecode, [column[i] for i in selection]))
+        return result
+
+    def filter(self, *token_types):
+        # Buffer with only the tokens of the given types, in order
+        wanted = {self.type_ids[token_type] for token_type in token_types}
+        return self.take([i for i, type_id in enumerate(self.types) if type_id in wanted])
+
+    def type(self, index):
+        return self.token_types[self.types[index]]
+
+    def value(self, index):
+        start = self.starts[index]
+        text = self.source[start:start + self.lengths[index]]
+        # A string running to the end of the input still gets its closing quote
+        if self.types[index] == self.string_id and (len(text) == 1 or not text.endswith('"')):
+            text += '"'
+        return text
+
+    # Serialized form: header (magic, token count, typecode of the wide
+    # columns), then the five arrays little-endian, all zlib-compressed
+    header = struct.Struct('<4sIc')
+    magic = b'LTB\x01'
+    def to_bytes(self):
+        largest = max((max(getattr(self, name), default=0) for name in self.column_names[1:]), default=0)
+        typecode = 'I' if largest < 1 << 32 else 'Q'
+        parts = [self.header.pack(self.magic, len(self.types), typecode.encode())]
+        for name in self.column_names:
+            column = getattr(self, name)
+            if name != 'types':
+                column = array(typecode, column)
+            if sys.byteorder == 'big':
+                column.byteswap()
+            parts.append(column.tobytes())
+        return zlib.compress(b''.join(parts), 1)
+
+    @classmethod
+    def from_bytes(cls, source, data):
+        # Inverse of to_bytes(), source must be the text the tokens came from
+        data = zlib.decompress(data)
+        magic, count, typecode = cls.header.unpack_from(data)
+        if magic != cls.magic:
+            raise ValueError("not a serialized TokenBuffer")
+        typecode = typecode.decode()
+        buffer = cls(source)
+        offset = cls.header.size
+        for name in cls.column_names:
+            column = array('B' if name == 'types' else typecode)
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+            if sys.byteorder == 'big':
+                column.byteswap()
+            setattr(buffer, name, array('q', column) if typecode == 'Q' and name != 'types' else column)
+        return buffer
+
+    def to_numpy(self):
+        # The arrays as NumPy arrays sharing their memory (needs numpy)
+        import numpy as np
+        columns = {name: getattr(self, name) for name in self.column_names}
+        return {name: np.frombuffer(column, dtype=np.dtype(column.typecode)) for name, column in columns.items()}
@@ -0,0 +1,63 @@
+# TokenCache.py
+import hashlib
+import os
+import tempfile
+from Tokenizer import Tokenizer
+from TokenBuffer import TokenBuffer
+
+class TokenCache:
+    # On-disk cache of tokenized scripts. An entry is addressed by the SHA-256
+    # of the tokenizer version and the script text, so an unchanged script is
+    # found again whatever its path, and a new tokenizer version never reads
+    # old entries. Entries hold TokenBuffer.to_bytes() or, for scripts that do
+    # not tokenize, the error message.
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text):
+        digest = hashlib.sha256(f"tokenizer-{Tokenizer.version}\0".encode())
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:] + '.tok')
+
+    def load(self, text, key=None):
+        # TokenBuffer of text, an Exception for a cached error, or None on a miss
+        try:
+            with open(self.path(key or self.key(text)), 'rb') as entry:
+                data = entry.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.deserialize(text, data)
+
+    def store(self, key, data):
+        # Writes a serialized entry (see serialize) atomically
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as entry:
+                entry.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @staticmethod
+    def serialize(result):
+        if isinstance(result, Exception):
+            return b'E' + str(result).encode('utf-8')
+        return b'T' + result.to_bytes()
+
+    @staticmethod
+    def deserialize(text, data):
+        if data.startswith(b'E'):
+            return Exception(data[1:].decode('utf-8'))
+        return TokenBuffer.from_bytes(text, data[1:])
@@ -1,25 +1,152 @@
 # Tokenizer.py
+import codecs
 import re
 from Token import Token
+from TokenBuffer import TokenBuffer
 from TokenType import TokenType
 
 class Tokenizer:
+    # Bump whenever the tokens produced for some input change, cached token
+    # streams of older versions are then ignored
+    version = 1
+
     def __init__(self, input_text: str):
         self.input = input_text
         self.position = 0
         self.line = 1
         self.column = 1
 
-    # Regex patterns for tokenizing
-    number_regex = r'(\d+\.\d+|\d+p|\d+)'
+    # Regex patterns for tokenizing, always matched in place with pattern.match(text, pos)
+    number_regex = re.compile(r'\d+\.\d+|\d+p|\d+')
+    whitespace_regex = re.compile(r'[ \t]+')
+    word_regex = re.compile(r'(?:[^\W\d_]|[$#])(?:[^\W_]|[$#])*')
+    string_regex = re.compile(r'"[^"]*"?')
+
+    # Master pattern: the first character decides the alternative, so a single
+    # match finds the token kind (match.lastgroup) and its extent
+    token_regex = re.compile(
+        r'(?P<symbol>==|>=|<=|!=|[()},{;/*+\-=<>])'
+        r'|(?P<word>' + word_regex.pattern + r')'
+        r'|(?P<number>' + number_regex.pattern + r')'
+        r'|(?P<string>' + string_regex.pattern + r')'
+    )
+
+    symbols = {
+        ')': TokenType.CLOSE_P,
+        '(': TokenType.OPEN_P,
+        ',': TokenType.COMMA,
+        '}': TokenType.CLOSE_BLOCK,
+        '{': TokenType.OPEN_BLOCK,
+        ';': TokenType.EOL,
+        '/': TokenType.DIVIDE,
+        '*': TokenType.MULTIPLY,
+        '+': TokenType.PLUS,
+        '-': TokenType.MINUS,
+        '=': TokenType.ASSIGN,
+        '==': TokenType.EQUAL,
+        '>': TokenType.GREATER,
+        '>=': TokenType.GREATER_EQUAL,
+        '<': TokenType.SMALLER,
+        '<=': TokenType.SMALLER_EQUAL,
+        '!=': TokenType.NOT_EQUAL,
+    }
+
+    # Any TokenType name is a keyword, whatever the case it is written in
+    keywords = dict(TokenType.__members__)
+
+    # Keywords seen so far as written (e.g. 'Int'), saves the upper() lookup.
+    # Identifiers are not cached: they are many and never need the lookup twice
+    word_types = {}
+    word_types_limit = 1 << 16
 
     def tokenize(self):
-        tokens = []
+        return list(self.iter_tokens())
+
+    def iter_tokens(self):
+        # Same tokens as tokenize(), produced lazily
+        yield from self.scan(final=True)
+        yield Token(TokenType.EOF, "", self.line, self.column)
+
+    def tokenize_buffer(self):
+        # Same tokens as tokenize(), kept as a TokenBuffer of offsets into the
+        # input: no Token object or value string is made while scanning
+        text = self.input
+        length = len(text)
+        buffer = TokenBuffer(text)
+        append = buffer.append
+        match_at = self.token_regex.match
+        symbols = self.symbols
+
+        while self.position < length:
+            current = text[self.position]
+            if current in ('\n', '\r'):
+                self.handle_newline(current)
+                continue
+            if current in (' ', '\t'):
+                self.skip_whitespace()
+                continue
+
+            match = match_at(text, self.position)
+            if match is None:
+                raise Exception(f"Unexpected character '{current}' at line {self.line}, column {self.column}")
+            start = self.position
+            end = match.end()
+            kind = match.lastgroup
+            if kind == 'symbol':
+                token_type = symbols[match.group()]
+            elif kind == 'word':
+                token_type = self.word_type(match.group())
+            elif kind == 'number':
+                token_type = self.number_type(match.group())
+            else:
+                token_type = TokenType.STR_VALUE
+            append(token_type, start, end - start, self.line, self.column)
+            if kind == 'string':
+                # The column counts a closing quote even when it is missing
+                terminated = end - start > 1 and text[end - 1] == '"'
+                self.position = end if terminated else end + 1
+                self.column += end - start if terminated else end - start + 1
+            else:
+                self.position = end
+                self.column += end - start
 
-        while self.position < len(self.input):
-            current = self.input[self.position]
+        append(TokenType.EOF, length, 0, self.line, self.column)
+        return buffer
+
+    @classmethod
+    def tokenize_stream(cls, fileobj, chunk_size=1 << 16):
+        # Lazily tokenizes a text or binary (UTF-8) file object, reading it in
+        # chunk_size pieces. Only the unfinished tail of the previous chunk is
+        # kept, so memory does not grow with the size of the script.
+        tokenizer = cls("")
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        while True:
+            chunk = fileobj.read(chunk_size)
+            final = not chunk
+            if isinstance(chunk, bytes):
+                chunk = decoder.decode(chunk, final=final)
+            tokenizer.input = tokenizer.input[tokenizer.position:] + chunk
+            tokenizer.position = 0
+            yield from tokenizer.scan(final)
+            if final:
+                break
+        yield Token(TokenType.EOF, "", tokenizer.line, tokenizer.column)
+
+    def scan(self, final):
+        # Yields the tokens of self.input. If more input may follow (final is
+        # False) it stops at the first token that could still continue in the
+        # next chunk: one ending less than two characters before the end of the
+        # buffer (e.g. "12" followed by ".5") or a '\r' that may start "\r\n".
+        text = self.input
+        length = len(text)
+        safe_end = length if final else length - 2
+
+        while self.position < length:
+            current = text[self.position]
 
             if current in ('\n', '\r'):
+                if not final and self.position + 1 >= length:
+                    return
                 self.handle_newline(current)
                 continue
 
@@ -28,20 +155,21 @@ class Tokenizer:
                 self.skip_whitespace()
                 continue
 
-            token = self.match_token()
+            match = self.token_regex.match(text, self.position)
+            if not final and (match.end() if match else self.position + 1) > safe_end:
+                return
+            token = self.match_token(match) if match else None
             if token:
-                tokens.append(token)
+                yield token
             else:
                 raise Exception(f"Unexpected character '{current}' at line {self.line}, column {self.column}")
 
-        tokens.append(Token(TokenType.EOF, "", self.line, self.column))
-        return tokens
-
     def skip_whitespace(self):
         # Skip over any whitespace characters
-        while self.position < len(self.input) and self.input[self.position] in (' ', '\t'):
-            self.position += 1
-            self.column += 1
+        match = self.whitespace_regex.match(self.input, self.position)
+        if match:
+            self.column += match.end() - self.position
+            self.position = match.end()
 
     def handle_newline(self, current):
         if current == '\n':
@@ -54,111 +182,76 @@ class Tokenizer:
             self.column = 1
         self.position += 1
 
-    def match_token(self):
-        current = self.input[self.position]
-
-        if current == ')':
-            return self.advance(TokenType.CLOSE_P, ")")
-        if current == '(':
-            return self.advance(TokenType.OPEN_P, "(")
-        if current == ',':
-            return self.advance(TokenType.COMMA, ",")
-        if current == '}':
-            return self.advance(TokenType.CLOSE_BLOCK, "}")
-        if current == '{':
-            return self.advance(TokenType.OPEN_BLOCK, "{")
-        if current == ';':
-            return self.advance(TokenType.EOL, ";")
-        if current == '/':
-            return self.advance(TokenType.DIVIDE, "/")
-        if current == '*':
-            return self.advance(TokenType.MULTIPLY, "*")
-        if current == '+':
-            return self.advance(TokenType.PLUS, "+")
-        if current == '-':
-            return self.advance(TokenType.MINUS, "-")
-
-        if current == '=':
-            if self.peek() == '=':
-                return self.advance_two(TokenType.EQUAL, "==")
-            return self.advance(TokenType.ASSIGN, "=")
-
-        if current == '>':
-            if self.peek() == '=':
-                return self.advance_two(TokenType.GREATER_EQUAL, ">=")
-            return self.advance(TokenType.GREATER, ">")
-
-        if current == '<':
-            if self.peek() == '=':
-                return self.advance_two(TokenType.SMALLER_EQUAL, "<=")
-            return self.advance(TokenType.SMALLER, "<")
-
-        if current == '!':
-            if self.peek() == '=':
-                return self.advance_two(TokenType.NOT_EQUAL, "!=")
+    def match_token(self, match=None):
+        if match is None:
+            match = self.token_regex.match(self.input, self.position)
+        if match is None:
             return None
 
-        if current.isalpha() or current in ('$','#'):
-            word = self.read_word()
-            return self.create_word_token(word)
-
-        if current.isdigit():
-            return self.match_number()
+        kind = match.lastgroup
+        if kind == 'symbol':
+            value = match.group()
+            self.position += len(value)
+            self.column += len(value)
+            return Token(self.symbols[value], value, self.line, self.column - len(value))
 
-        if current == '"':
-            return self.read_string()
+        if kind == 'word':
+            word = match.group()
+            self.position += len(word)
+            self.column += len(word)
+            return self.create_word_token(word)
 
-        return None
+        if kind == 'number':
+            return self.match_number(match)
 
-    def advance(self, token_type, value):
-        self.position += 1
-        self.column += 1
-        return Token(token_type, value, self.line, self.column - 1)
+        return self.read_string(match)
 
-    def advance_two(self, token_type, value):
-        self.position += 2
-        self.column += 2
-        return Token(token_type, value, self.line, self.column - 2)
+    def create_word_token(self, word):
+        # This function maps words to token types
+        return Token(self.word_type(word, self.column - len(word)), word, self.line, self.column - len(word))
 
-    def peek(self):
-        return self.input[self.position + 1] if self.position + 1 < len(self.input) else '\0'
+    def word_type(self, word, column=None):
+        # Token type of a word starting at the given column (default: the current one)
+        token_type = self.word_types.get(word)
+        if token_type is not None:
+            return token_type
+        if word[0] in '$#':
+            return TokenType.VAR_IDENTIFIER
+        token_type = self.keywords.get(word.upper())
+        if token_type is None:
+            column = self.column if column is None else column
+            raise Exception(f"Unexpected word '{word}' at line {self.line}, column {column}")
+        if len(self.word_types) < self.word_types_limit:
+            self.word_types[word] = token_type
+        return token_type
 
-    def read_word(self):
-        start = self.position
-        while self.position < len(self.input) and (self.input[self.position].isalnum() or self.input[self.position] in ('$', '#')):
-            self.position += 1
-            self.column += 1
-        return self.input[start:self.position]
+    @staticmethod
+    def number_type(value):
+        if value.endswith('p'):
+            return TokenType.PXLS_VALUE
+        if '.' in value:
+            return TokenType.DBL_VALUE
+        return TokenType.INT_VALUE
 
-    def create_word_token(self, word):
-        # This function maps words to token types
-        if word.upper() in TokenType.__members__:
-            return Token(TokenType[word.upper()], word, self.line, self.column - len(word))
-        if word.startswith('$') or word.startswith('#'):
-            return Token(TokenType.VAR_IDENTIFIER, word, self.line, self.column - len(word))
-        raise Exception(f"Unexpected word '{word}' at line {self.line}, column {self.column - len(word)}")
-
-    def match_number(self):
-        match = re.match(self.number_regex, self.input[self.position:])
+    def match_number(self, match=None):
+        # The master regex already matched the number when called from match_token
+        if match is None or match.lastgroup != 'number':
+            match = self.number_regex.match(self.input, self.position)
         if match:
-            value = match.group(0)
+            value = match.group()
             self.position += len(value)
             self.column += len(value)
-            if value.endswith('p'):
-                return Token(TokenType.PXLS_VALUE, value, self.line, self.column - len(value))
-            if '.' in value:
-                return Token(TokenType.DBL_VALUE, value, self.line, self.column - len(value))
-            return Token(TokenType.INT_VALUE, value, self.line, self.column - len(value))
+            return Token(self.number_type(value), value, self.line, self.column - len(value))
         return None
 
-    def read_string(self):
-        self.position += 1
-        self.column += 1
-        start = self.position
-        while self.position < len(self.input) and self.input[self.position] != '"':
-            self.position += 1
-            self.column += 1
-        value = self.input[start:self.position]
-        self.position += 1
-        self.column += 1
+    def read_string(self, match=None):
+        # Reads up to the closing quote or the end of input; as before, newlines
+        # inside a string only move the column
+        if match is None or match.lastgroup != 'string':
+            match = self.string_regex.match(self.input, self.position)
+        text = match.group()
+        terminated = len(text) > 1 and text.endswith('"')
+        value = text[1:-1] if terminated else text[1:]
+        self.position = match.end() if terminated else match.end() + 1
+        self.column += len(value) + 2
         return Token(TokenType.STR_VALUE, f'"{value}"', self.line, self.column - len(value) - 2)
@@ -0,0 +1,46 @@
+# TokenizerProfile.py
+import time
+from collections import Counter
+
+class TokenizerProfile:
+    # Optional instrumentation for Tokenizer: attach() wraps the scanning
+    # methods of one tokenizer instance to count the tokens of each TokenType
+    # and add up the time spent in each method. Tokenizers without a profile
+    # run the plain methods, so the hook costs nothing when unused.
+    # Times are inclusive: match_token contains the calls it makes to the
+    # other three. tokenize_buffer() does not go through these methods.
+
+    methods = ('match_token', 'match_number', 'read_string', 'create_word_token')
+
+    def __init__(self):
+        self.counts = Counter()
+        self.seconds = dict.fromkeys(self.methods, 0.0)
+        self.calls = dict.fromkeys(self.methods, 0)
+
+    def attach(self, tokenizer):
+        for name in self.methods:
+            setattr(tokenizer, name, self.wrap(name, getattr(tokenizer, name)))
+        return tokenizer
+
+    def wrap(self, name, method):
+        seconds = self.seconds
+        calls = self.calls
+        counts = self.counts
+        clock = time.perf_counter
+        count_tokens = name == 'match_token'
+
+        def timed(*args):
+            started = clock()
+            token = method(*args)
+            seconds[name] += clock() - started
+            calls[name] += 1
+            if count_tokens and token is not None:
+                counts[token.type] += 1
+            return token
+        return timed
+
+    def report(self):
+        return {
+            'tokens': {token_type.name: count for token_type, count in self.counts.most_common()},
+            'methods': {name: {'calls': self.calls[name], 'seconds': self.seconds[name]} for name in self.methods},
+        }
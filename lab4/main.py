@@ -1,3 +1,4 @@
+from lab4.regex_counter import RegexCounter
 from lab4.regex_generator import RegexGenerator
 from lab4.regex_parser import RegexParser
 from lab4.regex_tree_printer import RegexTreePrinter
@@ -12,6 +13,7 @@ def main():
 
     regex_parser = RegexParser()
     regex_generator = RegexGenerator(regex_parser)
+    regex_counter = RegexCounter(regex_parser)
 
     for i, pattern in enumerate(patterns):
         print("REGEX GENERATOR:")
@@ -25,6 +27,7 @@ def main():
 
         print(f"All combinations valid: {all(re.match(f'^{pattern}$', combo) for combo in valid_combinations)}")
         print(f"Total amount of generated symbols: {len(valid_combinations)}")
+        print(f"Strings the generator can produce: {regex_counter.count(pattern)}")
 
         print("\nProcessing sequence for pattern {i + 1}:")
         root_node = regex_parser.parse_regex(pattern)
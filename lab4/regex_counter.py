@@ -0,0 +1,202 @@
+import random
+
+from lab4.regex_generator import RegexGenerator
+from lab4.regex_node import RegexNodeType
+
+
+class RegexCounter(RegexGenerator):
+    # Counting, ranking and sampling over exactly the strings RegexGenerator
+    # produces, in its order and with its duplicates, without enumerating them.
+    # Every node gets, in one bottom-up pass, its number of strings and a list
+    # of how many of them have each length (Python ints, so sizes are exact).
+
+    def count(self, pattern):
+        return self.node_total(self.regex_parser.parse_regex(pattern), {})
+
+    def count_by_length(self, pattern):
+        # counts[length] = number of generated strings of that length
+        return list(self.node_lengths(self.regex_parser.parse_regex(pattern), {}))
+
+    def unrank(self, pattern, rank):
+        # The string generate_combinations_from_node would put at index rank
+        root_node = self.regex_parser.parse_regex(pattern)
+        cache = {}
+        if not 0 <= rank < self.node_total(root_node, cache):
+            raise IndexError(f"rank {rank} is out of range for {pattern!r}")
+        return self.unrank_node(root_node, rank, cache)
+
+    def sample(self, pattern, count=1, seed=None, length=None):
+        # count strings drawn uniformly (with replacement) from the generated
+        # strings, or from those of the given length
+        root_node = self.regex_parser.parse_regex(pattern)
+        cache = {}
+        rng = random.Random(seed)
+        if length is None:
+            total = self.node_total(root_node, cache)
+            if total == 0:
+                raise ValueError(f"{pattern!r} generates no strings")
+            return [self.unrank_node(root_node, rng.randrange(total), cache) for _ in range(count)]
+        lengths = self.node_lengths(root_node, cache)
+        total = lengths[length] if 0 <= length < len(lengths) else 0
+        if total == 0:
+            raise ValueError(f"{pattern!r} generates no strings of length {length}")
+        return [self.unrank_length(root_node, length, rng.randrange(total), cache) for _ in range(count)]
+
+    def node_total(self, node, cache):
+        key = ('total', id(node))
+        if key not in cache:
+            cache[key] = sum(self.node_lengths(node, cache))
+        return cache[key]
+
+    def node_lengths(self, node, cache):
+        key = ('lengths', id(node))
+        if key in cache:
+            return cache[key]
+
+        if node.type == RegexNodeType.LITERAL:
+            lengths = [0] * len(node.value) + [1]
+        elif node.type == RegexNodeType.ALTERNATION:
+            lengths = []
+            for child in node.children:
+                lengths = self.add_lengths(lengths, self.node_lengths(child, cache))
+        elif node.type == RegexNodeType.CONCATENATION:
+            lengths = self.suffix_lengths(node, cache)[0]
+        else:
+            empty_first, counts = self.repetition_counts(node)
+            lengths = [1] if empty_first else []
+            for count in counts:
+                lengths = self.add_lengths(lengths, self.power_lengths(node.children[0], count, cache))
+
+        cache[key] = lengths
+        return lengths
+
+    def suffix_lengths(self, node, cache):
+        # Length counts of the concatenation of children[i:], for every i
+        key = ('suffix', id(node))
+        if key not in cache:
+            suffixes = [[1]]
+            for child in reversed(node.children):
+                suffixes.append(self.multiply_lengths(self.node_lengths(child, cache), suffixes[-1]))
+            cache[key] = suffixes[::-1]
+        return cache[key]
+
+    def power_lengths(self, node, count, cache):
+        # Length counts of count repetitions of node
+        key = ('power', id(node))
+        powers = cache.setdefault(key, [[1]])
+        while len(powers) <= count:
+            powers.append(self.multiply_lengths(powers[-1], self.node_lengths(node, cache)))
+        return powers[count]
+
+    @staticmethod
+    def add_lengths(first, second):
+        if len(first) < len(second):
+            first, second = second, first
+        result = list(first)
+        for length, count in enumerate(second):
+            result[length] += count
+        return result
+
+    @staticmethod
+    def multiply_lengths(first, second):
+        # Length counts of the concatenations of the two sets of strings
+        if not any(first) or not any(second):
+            return []
+        result = [0] * (len(first) + len(second) - 1)
+        for i, a in enumerate(first):
+            if a:
+                for j, b in enumerate(second):
+                    result[i + j] += a * b
+        return result
+
+    def unrank_node(self, node, rank, cache):
+        if node.type == RegexNodeType.LITERAL:
+            return node.value
+
+        if node.type == RegexNodeType.ALTERNATION:
+            for child in node.children:
+                total = self.node_total(child, cache)
+                if rank < total:
+                    return self.unrank_node(child, rank, cache)
+                rank -= total
+
+        elif node.type == RegexNodeType.CONCATENATION:
+            return self.unrank_product(node.children, rank, cache)
+
+        else:
+            empty_first, counts = self.repetition_counts(node)
+            if empty_first:
+                if rank == 0:
+                    return ""
+                rank -= 1
+            base = node.children[0]
+            base_total = self.node_total(base, cache)
+            for count in counts:
+                size = base_total ** count
+                if rank < size:
+                    return self.unrank_product([base] * count, rank, cache)
+                rank -= size
+
+        raise IndexError("rank out of range")
+
+    def unrank_product(self, nodes, rank, cache):
+        # The product is ordered with the first node varying slowest, so the
+        # rank is a mixed-radix number whose last digit belongs to the last node
+        parts = []
+        for node in reversed(nodes):
+            rank, digit = divmod(rank, self.node_total(node, cache))
+            parts.append(self.unrank_node(node, digit, cache))
+        return "".join(reversed(parts))
+
+    def unrank_length(self, node, length, rank, cache):
+        # The rank-th generated string of the given length, ordering strings by
+        # how they split into parts (not the generator order); enough for sampling
+        if node.type == RegexNodeType.LITERAL:
+            return node.value
+
+        if node.type == RegexNodeType.ALTERNATION:
+            for child in node.children:
+                lengths = self.node_lengths(child, cache)
+                total = lengths[length] if length < len(lengths) else 0
+                if rank < total:
+                    return self.unrank_length(child, length, rank, cache)
+                rank -= total
+
+        elif node.type == RegexNodeType.CONCATENATION:
+            return self.unrank_product_length(node.children, self.suffix_lengths(node, cache), length, rank, cache)
+
+        else:
+            empty_first, counts = self.repetition_counts(node)
+            if empty_first and length == 0:
+                if rank == 0:
+                    return ""
+                rank -= 1
+            base = node.children[0]
+            for count in counts:
+                lengths = self.power_lengths(base, count, cache)
+                total = lengths[length] if length < len(lengths) else 0
+                if rank < total:
+                    suffixes = [self.power_lengths(base, count - i, cache) for i in range(count + 1)]
+                    return self.unrank_product_length([base] * count, suffixes, length, rank, cache)
+                rank -= total
+
+        raise IndexError("rank out of range")
+
+    def unrank_product_length(self, nodes, suffixes, length, rank, cache):
+        # suffixes[i] holds the length counts of the product of nodes[i:]
+        parts = []
+        for i, node in enumerate(nodes):
+            lengths = self.node_lengths(node, cache)
+            rest = suffixes[i + 1]
+            for part_length in range(min(length, len(lengths) - 1) + 1):
+                rest_total = rest[length - part_length] if length - part_length < len(rest) else 0
+                size = lengths[part_length] * rest_total
+                if rank < size:
+                    rank, part_rank = divmod(rank, lengths[part_length])
+                    parts.append(self.unrank_length(node, part_length, part_rank, cache))
+                    length -= part_length
+                    break
+                rank -= size
+            else:
+                raise IndexError("rank out of range")
+        return "".join(parts)
@@ -1,5 +1,37 @@
+from itertools import islice
+
 from lab4.regex_node import RegexNodeType
 
+
+class LazySequence:
+    # Strings of a generator, kept as they are produced so that the same
+    # sequence can be iterated again (and by several loops at once) while
+    # only ever computing the prefix that was asked for
+    def __init__(self, iterator):
+        self.iterator = iterator
+        self.items = []
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index < len(self.items):
+                yield self.items[index]
+            elif self.iterator is None:
+                return
+            else:
+                try:
+                    item = next(self.iterator)
+                except StopIteration:
+                    self.iterator = None
+                    return
+                self.items.append(item)
+                yield item
+            index += 1
+
+    def is_empty(self):
+        return next(iter(self), None) is None
+
+
 class RegexGenerator:
     def __init__(self, regex_parser, repetition_limit=5):
         self.repetition_limit = repetition_limit
@@ -7,66 +39,69 @@ class RegexGenerator:
 
     def generate_valid_combinations(self, pattern, max_combinations=40):
         root_node = self.regex_parser.parse_regex(pattern)
-        results = self.generate_combinations_from_node(root_node)
 
-        # Limit the number of combinations generated
-        return results[:max_combinations]
+        # Only the first max_combinations strings are ever built
+        return list(islice(self.iter_combinations_from_node(root_node), max_combinations))
 
     def generate_combinations_from_node(self, node):
-        results = []
+        return list(self.iter_combinations_from_node(node))
 
+    def iter_combinations_from_node(self, node, cache=None):
+        # Same strings in the same order as generate_combinations_from_node
+        # always produced, but lazily. Sub-results are shared through one
+        # LazySequence per node.
+        if cache is None:
+            cache = {}
+        return iter(self.node_sequence(node, cache))
+
+    def node_sequence(self, node, cache):
+        sequence = cache.get(id(node))
+        if sequence is None:
+            sequence = LazySequence(self.node_strings(node, cache))
+            cache[id(node)] = sequence
+        return sequence
+
+    def node_strings(self, node, cache):
         if node.type == RegexNodeType.LITERAL:
-            results.append(node.value)
+            yield node.value
 
         elif node.type == RegexNodeType.ALTERNATION:
             for child in node.children:
-                results.extend(self.generate_combinations_from_node(child))
+                yield from self.node_sequence(child, cache)
 
         elif node.type == RegexNodeType.CONCATENATION:
-            results.append("")
-            for child in node.children:
-                child_combos = self.generate_combinations_from_node(child)
-                new_results = []
-                for existing_result in results:
-                    for child_combo in child_combos:
-                        new_results.append(existing_result + child_combo)
-                results = new_results
+            yield from self.product([self.node_sequence(child, cache) for child in node.children])
 
         elif node.type == RegexNodeType.REPETITION:
-            base_results = self.generate_combinations_from_node(node.children[0])
-            results.append("")  # For empty case like * or ?
-
-            if node.min_repeat == 0 and node.max_repeat == 1:  # ? (0 or 1)
-                results.extend(base_results)
-            elif node.min_repeat == 1 and node.max_repeat == -1:  # + (1 or more)
-                for count in range(1, self.repetition_limit + 1):
-                    combinations = self.generate_repetitions(base_results, count)
-                    results.extend(combinations)
-                results.pop(0)  # Remove empty case for + operator
-            elif node.min_repeat == 0 and node.max_repeat == -1:  # * (0 or more)
-                for count in range(1, self.repetition_limit + 1):
-                    combinations = self.generate_repetitions(base_results, count)
-                    results.extend(combinations)
-            else:  # {n} or {n,m}
-                max_repeat = self.repetition_limit if node.max_repeat == -1 else min(node.max_repeat, self.repetition_limit)
-                for count in range(node.min_repeat, max_repeat + 1):
-                    combinations = self.generate_repetitions(base_results, count)
-                    results.extend(combinations)
-                if node.min_repeat > 0:
-                    results.pop(0)  # Remove empty case for {n,m} where n > 0
-
-        return results
+            base = self.node_sequence(node.children[0], cache)
+            empty_first, counts = self.repetition_counts(node)
+            if empty_first:
+                yield ""
+            for count in counts:
+                yield from self.product([base] * count)
+
+    def repetition_counts(self, node):
+        # Whether a repetition node starts with an extra empty string, and the
+        # repetition counts it then goes through, in order
+        if node.min_repeat == 0 and node.max_repeat == 1:  # ? (0 or 1)
+            return True, range(1, 2)
+        if node.min_repeat == 1 and node.max_repeat == -1:  # + (1 or more)
+            return False, range(1, self.repetition_limit + 1)
+        if node.min_repeat == 0 and node.max_repeat == -1:  # * (0 or more)
+            return True, range(1, self.repetition_limit + 1)
+        # {n} or {n,m}; for n = 0 the empty string comes twice, as count 0 follows
+        max_repeat = self.repetition_limit if node.max_repeat == -1 else min(node.max_repeat, self.repetition_limit)
+        return node.min_repeat == 0, range(node.min_repeat, max_repeat + 1)
+
+    def product(self, sequences, index=0, prefix=""):
+        # Concatenations of one string per sequence, the first sequence varying slowest
+        if index == 0 and any(sequence.is_empty() for sequence in sequences):
+            return
+        if index == len(sequences):
+            yield prefix
+            return
+        for string in sequences[index]:
+            yield from self.product(sequences, index + 1, prefix + string)
 
     def generate_repetitions(self, base_strings, count):
-        if count == 0:
-            return [""]
-        if count == 1:
-            return base_strings[:]
-
-        result = []
-        sub_results = self.generate_repetitions(base_strings, count - 1)
-        for sub_result in sub_results:
-            for base_str in base_strings:
-                result.append(sub_result + base_str)
-
-        return result
+        return list(self.product([LazySequence(iter(base_strings))] * count))
@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from bench_automata import random_right_linear_grammar  # noqa: E402  (puts lab1 and lab2 on the path)
+from main import Grammar  # noqa: E402  (lab1)
+
+
+def test_unbounded_generation_skips_counting_on_large_grammar():
+    # 1024 non-terminals determinize to about 7700 states; counting over them
+    # on every call made generate_string() run out of memory
+    grammar = random_right_linear_grammar(1024, 4, 3, seed=0)
+    started = time.perf_counter()
+    strings = [grammar.generate_string() for _ in range(300)]
+    strings += list(grammar.generate_strings(300, seed=1))
+    assert time.perf_counter() - started < 2.0
+    assert grammar._automaton is None and grammar._length_counts is None
+    assert grammar.to_finite_automaton().match_many(strings) == [True] * len(strings)
+
+
+def test_bounded_generation_on_large_grammar():
+    grammar = random_right_linear_grammar(1024, 4, 3, seed=0)
+    strings = list(grammar.generate_strings(200, seed=2, min_length=3, max_length=12))
+    assert all(3 <= len(s) <= 12 for s in strings)
+    assert grammar.is_infinite()
+    assert [grammar.rank(grammar.unrank(index)) for index in range(50)] == list(range(50))
+
+
+def test_unmet_bounds_fail_fast():
+    grammar = Grammar({'S', 'A'}, {'a', 'b'}, {'S': ['aA'], 'A': ['b', 'bb']}, 'S')
+    assert sorted(set(grammar.generate_strings(20, seed=3, min_length=3))) == ['abb']
+    with pytest.raises(ValueError):
+        next(grammar.generate_strings(1, min_length=4))
+    with pytest.raises(ValueError):
+        grammar.generate_strings(1, min_length=2, max_length=1)
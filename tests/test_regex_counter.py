@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+from collections import Counter
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lab4.regex_counter import RegexCounter  # noqa: E402
+from lab4.regex_parser import RegexParser  # noqa: E402
+from test_regex_generator import small_patterns  # noqa: E402
+
+
+def length_counts(strings):
+    counts = Counter(map(len, strings))
+    return [counts[length] for length in range(max(counts) + 1)] if counts else []
+
+
+def test_counts_and_ranks_match_enumeration():
+    parser = RegexParser()
+    for limit in (1, 2, 3):
+        counter = RegexCounter(parser, repetition_limit=limit)
+        for pattern, root in small_patterns(counter, parser, 100, seed=10 + limit):
+            strings = counter.generate_combinations_from_node(root)
+            assert counter.count(pattern) == len(strings), pattern
+            assert counter.count_by_length(pattern) == length_counts(strings), pattern
+            cache = {}
+            assert [counter.unrank_node(root, rank, cache) for rank in range(len(strings))] == strings, pattern
+            for rank in random.Random(limit).sample(range(len(strings)), min(len(strings), 5)):
+                assert counter.unrank(pattern, rank) == strings[rank], pattern
+            with pytest.raises(IndexError):
+                counter.unrank(pattern, len(strings))
+
+
+def test_length_ranks_cover_each_length_exactly():
+    # unrank_length only has to hit every string of a length as often as the
+    # generator produces it, which is what makes sample(length=...) uniform
+    parser = RegexParser()
+    counter = RegexCounter(parser, repetition_limit=2)
+    for pattern, root in small_patterns(counter, parser, 100, seed=20):
+        by_length = {}
+        for string in counter.generate_combinations_from_node(root):
+            by_length.setdefault(len(string), Counter())[string] += 1
+        cache = {}
+        for length, expected in by_length.items():
+            total = sum(expected.values())
+            found = Counter(counter.unrank_length(root, length, rank, cache) for rank in range(total))
+            assert found == expected, (pattern, length)
+
+
+def test_sample():
+    parser = RegexParser()
+    counter = RegexCounter(parser, repetition_limit=3)
+    pattern = "(a|bc)*d?"
+    strings = set(counter.generate_combinations_from_node(parser.parse_regex(pattern)))
+    samples = counter.sample(pattern, 200, seed=1)
+    assert len(samples) == 200 and set(samples) <= strings
+    assert samples == counter.sample(pattern, 200, seed=1)
+    assert all(len(s) == 4 for s in counter.sample(pattern, 50, seed=2, length=4))
+    with pytest.raises(ValueError):
+        counter.sample(pattern, length=20)
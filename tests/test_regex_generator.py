@@ -0,0 +1,106 @@
+import os
+import random
+import sys
+from itertools import islice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lab4.regex_generator import RegexGenerator  # noqa: E402
+from lab4.regex_node import RegexNodeType  # noqa: E402
+from lab4.regex_parser import RegexParser  # noqa: E402
+
+# Patterns are only compared when they generate at most this many strings
+MAX_STRINGS = 5000
+
+
+def reference_combinations(node, limit):
+    """The eager generator RegexGenerator started from: every string, built bottom-up."""
+    if node.type == RegexNodeType.LITERAL:
+        return [node.value]
+    if node.type == RegexNodeType.ALTERNATION:
+        return [s for child in node.children for s in reference_combinations(child, limit)]
+    if node.type == RegexNodeType.CONCATENATION:
+        results = [""]
+        for child in node.children:
+            child_combos = reference_combinations(child, limit)
+            results = [existing + combo for existing in results for combo in child_combos]
+        return results
+
+    base = reference_combinations(node.children[0], limit)
+    results = [""]
+    if node.min_repeat == 0 and node.max_repeat == 1:
+        results.extend(base)
+    elif node.min_repeat == 1 and node.max_repeat == -1:
+        for count in range(1, limit + 1):
+            results.extend(reference_repetitions(base, count))
+        results.pop(0)
+    elif node.min_repeat == 0 and node.max_repeat == -1:
+        for count in range(1, limit + 1):
+            results.extend(reference_repetitions(base, count))
+    else:
+        max_repeat = limit if node.max_repeat == -1 else min(node.max_repeat, limit)
+        for count in range(node.min_repeat, max_repeat + 1):
+            results.extend(reference_repetitions(base, count))
+        if node.min_repeat > 0:
+            results.pop(0)
+    return results
+
+
+def reference_repetitions(base, count):
+    if count == 0:
+        return [""]
+    if count == 1:
+        return base[:]
+    return [sub + s for sub in reference_repetitions(base, count - 1) for s in base]
+
+
+def random_pattern(rng, depth=2):
+    """Small pattern over 'a' and 'b' with groups, alternation and every repetition form."""
+    terms = []
+    for _ in range(rng.randint(1, 3)):
+        if depth and rng.random() < 0.3:
+            term = "(" + random_pattern(rng, depth - 1) + ")"
+        else:
+            term = rng.choice("ab")
+        terms.append(term + rng.choice(["", "", "?", "*", "+", "{2}", "{0,2}", "{1,2}", "{0}"]))
+    pattern = "".join(terms)
+    if rng.random() < 0.3:
+        pattern += "|" + random_pattern(rng, depth - 1 if depth else 0)
+    return pattern
+
+
+def small_patterns(generator, parser, count, seed):
+    rng = random.Random(seed)
+    while count:
+        pattern = random_pattern(rng)
+        root = parser.parse_regex(pattern)
+        if len(list(islice(generator.iter_combinations_from_node(root), MAX_STRINGS + 1))) <= MAX_STRINGS:
+            yield pattern, root
+            count -= 1
+
+
+def test_lazy_generator_matches_reference():
+    parser = RegexParser()
+    for limit in (1, 2, 3):
+        generator = RegexGenerator(parser, repetition_limit=limit)
+        for pattern, root in small_patterns(generator, parser, 150, seed=limit):
+            expected = reference_combinations(root, limit)
+            assert generator.generate_combinations_from_node(root) == expected, pattern
+            assert generator.generate_valid_combinations(pattern) == expected[:40], pattern
+            assert generator.generate_valid_combinations(pattern, 7) == expected[:7], pattern
+
+
+def test_repetitions_match_reference():
+    generator = RegexGenerator(RegexParser())
+    for base in ([], [""], ["a"], ["a", "bc", ""]):
+        for count in range(4):
+            assert generator.generate_repetitions(base, count) == reference_repetitions(base, count)
+
+
+def test_examples_of_main():
+    parser = RegexParser()
+    generator = RegexGenerator(parser)
+    for pattern in ("(a|b)(c|d)E+G?", "P(Q|R|S)T(UV|W|X)*Z+", "1(0|1)*2(3|4){5}36"):
+        root = parser.parse_regex(pattern)
+        assert generator.generate_valid_combinations(pattern) == reference_combinations(root, 5)[:40]
@@ -0,0 +1,155 @@
+import io
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "lab3", "code"))
+
+from Tokenizer import Tokenizer  # noqa: E402  (lab3)
+from TokenType import TokenType  # noqa: E402  (lab3)
+
+SYMBOLS = {')': TokenType.CLOSE_P, '(': TokenType.OPEN_P, ',': TokenType.COMMA, '}': TokenType.CLOSE_BLOCK,
+           '{': TokenType.OPEN_BLOCK, ';': TokenType.EOL, '/': TokenType.DIVIDE, '*': TokenType.MULTIPLY,
+           '+': TokenType.PLUS, '-': TokenType.MINUS}
+PAIRS = {'=': (TokenType.ASSIGN, TokenType.EQUAL), '>': (TokenType.GREATER, TokenType.GREATER_EQUAL),
+         '<': (TokenType.SMALLER, TokenType.SMALLER_EQUAL), '!': (None, TokenType.NOT_EQUAL)}
+
+
+def reference_tokens(text):
+    """(type, value, line, column) of every token, scanned one character at a
+    time as the Tokenizer did before the master regex. Errors are returned as
+    the message of the exception, after the tokens found before them."""
+    tokens = []
+    position, line, column = 0, 1, 1
+
+    def emit(token_type, value, width):
+        nonlocal position, column
+        tokens.append((token_type, value, line, column))
+        position += width
+        column += width
+
+    while position < len(text):
+        current = text[position]
+        following = text[position + 1] if position + 1 < len(text) else '\0'
+        if current in ('\n', '\r'):
+            if current == '\r' and following == '\n':
+                position += 1
+            position += 1
+            line, column = line + 1, 1
+        elif current in (' ', '\t'):
+            position += 1
+            column += 1
+        elif current in SYMBOLS:
+            emit(SYMBOLS[current], current, 1)
+        elif current in PAIRS and following == '=':
+            emit(PAIRS[current][1], current + '=', 2)
+        elif current in PAIRS and PAIRS[current][0] is not None:
+            emit(PAIRS[current][0], current, 1)
+        elif current.isalpha() or current in ('$', '#'):
+            end = position
+            while end < len(text) and (text[end].isalnum() or text[end] in ('$', '#')):
+                end += 1
+            word = text[position:end]
+            if word.upper() in TokenType.__members__:
+                emit(TokenType[word.upper()], word, len(word))
+            elif word[0] in ('$', '#'):
+                emit(TokenType.VAR_IDENTIFIER, word, len(word))
+            else:
+                return tokens, f"Unexpected word '{word}' at line {line}, column {column}"
+        elif current.isdigit():
+            end = position
+            while end < len(text) and text[end].isdigit():
+                end += 1
+            if end + 1 < len(text) and text[end] == '.' and text[end + 1].isdigit():
+                end += 1
+                while end < len(text) and text[end].isdigit():
+                    end += 1
+                emit(TokenType.DBL_VALUE, text[position:end], end - position)
+            elif end < len(text) and text[end] == 'p':
+                emit(TokenType.PXLS_VALUE, text[position:end + 1], end + 1 - position)
+            else:
+                emit(TokenType.INT_VALUE, text[position:end], end - position)
+        elif current == '"':
+            end = text.find('"', position + 1)
+            end = len(text) if end < 0 else end
+            value = text[position + 1:end]
+            tokens.append((TokenType.STR_VALUE, f'"{value}"', line, column))
+            position = end + 1
+            column += len(value) + 2
+        else:
+            return tokens, f"Unexpected character '{current}' at line {line}, column {column}"
+
+    tokens.append((TokenType.EOF, "", line, column))
+    return tokens, None
+
+
+def collect(tokenize):
+    """Like reference_tokens, for a function returning Token or TokenView objects."""
+    found = []
+    try:
+        for token in tokenize():
+            found.append((token.type, token.value, token.line, token.column))
+    except Exception as error:
+        return found, str(error)
+    return found, None
+
+
+# Pieces of valid scripts, and pieces the tokenizer rejects
+PIECES = ([name for name in TokenType.__members__ if '_' not in name]
+          + ['int', 'Foreach', 'bw', '$v', '$v1', '#b', '$', '#a$b', '0', '12', '3.5', '7p']
+          + list('(),{};/*+-=<>') + ['==', '>=', '<=', '!=', '=<']
+          + ['"ab c"', '"', '""', '"x\ny"', '" q'] + [' ', '\t', '\n', '\r\n', '\r', '\r\r\n'])
+ERRORS = ['@', '?', '_', '!', 'foo', 'img2', 'TYPE_INT', '12.', '1.2.3', '4px', "'"]
+
+
+def random_script(rng, pieces=40, error_share=0.0):
+    parts = []
+    for _ in range(rng.randrange(pieces)):
+        parts.append(rng.choice(ERRORS if rng.random() < error_share else PIECES))
+        if rng.random() < 0.8:
+            parts.append(rng.choice(' \n'))
+    return "".join(parts)
+
+
+def random_scripts(count, seed, error_share=0.0):
+    rng = random.Random(seed)
+    return [random_script(rng, error_share=error_share) for _ in range(count)]
+
+
+def test_tokenize_matches_reference():
+    for text in random_scripts(3000, seed=1) + random_scripts(1000, seed=2, error_share=0.05):
+        tokens, error = reference_tokens(text)
+        # tokenize() returns nothing when it fails, only the error is compared
+        assert collect(Tokenizer(text).tokenize) == (tokens if error is None else [], error), repr(text)
+
+
+def test_iter_tokens_and_buffer_match_reference():
+    for text in random_scripts(1000, seed=3, error_share=0.02):
+        expected = reference_tokens(text)
+        assert collect(Tokenizer(text).iter_tokens) == expected, repr(text)
+        if expected[1] is None:
+            assert collect(Tokenizer(text).tokenize_buffer) == expected, repr(text)
+
+
+def test_keyword_cache_holds_only_keywords():
+    Tokenizer("$a #b $c1 INT iNt").tokenize()
+    assert all(not word.startswith(('$', '#')) for word in Tokenizer.word_types)
+    assert Tokenizer.word_types['iNt'] is TokenType.INT
+
+
+def test_tokenize_stream_matches_tokenize():
+    for text in random_scripts(300, seed=4, error_share=0.02) + ['12.5', '"a\r\n', 'IF $a >= 1 {\r\n}\r']:
+        expected = reference_tokens(text)
+        for chunk_size in (1, 2, 3, 7, 64):
+            found = collect(lambda: Tokenizer.tokenize_stream(io.StringIO(text), chunk_size))
+            assert found == expected, (text, chunk_size)
+        found = collect(lambda: Tokenizer.tokenize_stream(io.BytesIO(text.encode('utf-8')), 1))
+        assert found == expected, repr(text)
+
+
+def test_tokenize_stream_decodes_split_characters():
+    # "é" is two UTF-8 bytes, read one at a time they still give one character
+    text = 'BATCH #b = "café";\n'
+    expected = collect(Tokenizer(text).tokenize)
+    assert collect(lambda: Tokenizer.tokenize_stream(io.BytesIO(text.encode('utf-8')), 1)) == expected